@@ -0,0 +1,211 @@
+import csv
+import json
+import os
+import random
+import tempfile
+from typing import Dict, List, Optional
+
+from classes.PerfilExecucao import PerfilExecucao
+from main import (carregarTabelaDisciplinas, criarListaAdjacencia, colorirGrafo, colorirGrafoDSatur,
+                  alocarHorariosEmparelhamento, configurar_log, exportar_horarios,
+                  exportar_planilha_consolidada)
+
+
+# Proporções próximas das de datasets/csv: quase todas as disciplinas têm 4 horas
+CH_PADRAO = {2: 0.05, 3: 0.1, 4: 0.8, 5: 0.05}
+
+def gerarInstanciaSintetica(caminho: str, cursos: int = 4, periodos: int = 4, disciplinas_por_periodo: int = 5,
+                            professores: int = 27, mix_ch: Dict[int, float] = None,
+                            compartilhamento: float = 0.08, formato: str = 'largo', semente: int = 42,
+                            ocupacao: float = 0.8) -> str:
+    """
+    Gera uma instância sintética no mesmo layout de datasets/csv.
+
+    O primeiro curso é SIN (noturno) e o segundo CCO; os demais se chamam CUR3, CUR4...
+    Cada disciplina recebe um professor, distribuídos de forma equilibrada (um professor só
+    volta a ser sorteado depois que todos receberam a mesma quantidade), e com
+    probabilidade compartilhamento um segundo professor.
+
+    Como nas turmas reais, a carga de cada turma cabe na semana: uma carga horária sorteada
+    que passaria de ocupacao dos horários da turma (10 à noite, 20 de dia, metade deles em
+    blocos de 3 horas) é trocada por uma disciplina de 2 horas, e a turma para de receber
+    disciplinas quando nem essa cabe. disciplinas_por_periodo é portanto um máximo.
+
+    Args:
+        caminho: Arquivo CSV de destino
+        cursos: Quantidade de cursos
+        periodos: Períodos por curso
+        disciplinas_por_periodo: Disciplinas por turma (curso e período)
+        professores: Quantidade de professores (colunas Prof 1 .. Prof N)
+        mix_ch: Proporção de cada carga horária (2, 3, 4 e 5 horas); padrão CH_PADRAO
+        compartilhamento: Probabilidade de uma disciplina ter dois professores
+        formato: 'largo' (uma coluna 0/1 por professor) ou 'longo' (uma linha por par
+            disciplina/professor), os dois aceitos por carregarDisciplinasCsv
+        semente: Semente do gerador aleatório
+        ocupacao: Fração máxima dos horários da turma ocupada pelas disciplinas
+
+    Returns:
+        O caminho do arquivo gerado
+    """
+    gerador = random.Random(semente)
+    mix_ch = mix_ch or CH_PADRAO
+    cargas = list(mix_ch)
+    pesos = [mix_ch[ch] for ch in cargas]
+    nomes_cursos = ['SIN', 'CCO'] + [f'CUR{c}' for c in range(3, cursos + 1)]
+
+    fila_professores = []
+
+    def sortear_professor() -> int:
+        if not fila_professores:
+            fila_professores.extend(range(1, professores + 1))
+            gerador.shuffle(fila_professores)
+        return fila_professores.pop()
+
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.writer(arquivo)
+        cabecalho = ['Curso', 'PPC', 'Período', 'Código da Disciplina', 'Nome da Disciplina', 'CH']
+        if formato == 'longo':
+            escritor.writerow(cabecalho + ['Professor'])
+        else:
+            escritor.writerow(cabecalho + [f'Prof {p}' for p in range(1, professores + 1)])
+
+        for curso in nomes_cursos[:cursos]:
+            horarios_turma = 10 if curso == 'SIN' else 20
+            for periodo in range(1, periodos + 1):
+                livres = int(horarios_turma * ocupacao)
+                livres_3h = int(horarios_turma // 2 * ocupacao)
+                for d in range(1, disciplinas_por_periodo + 1):
+                    ch = gerador.choices(cargas, pesos)[0]
+                    # Aulas de 2 horas e de 3 horas de cada carga horária (ver carregarDisciplinasCsv)
+                    aulas, aulas_3h = {2: (1, 0), 3: (1, 1), 4: (2, 0), 5: (2, 1)}.get(ch, (1, 0))
+                    if aulas > livres or aulas_3h > livres_3h:
+                        ch, aulas, aulas_3h = 2, 1, 0
+                    if aulas > livres:
+                        break
+                    livres -= aulas
+                    livres_3h -= aulas_3h
+
+                    codigo = f"{curso}{periodo:02d}{d:02d}"
+                    linha = [curso, '2024', str(periodo), codigo, f"Disciplina {codigo}", str(ch)]
+
+                    ministrantes = [sortear_professor()]
+                    if professores > 1 and gerador.random() < compartilhamento:
+                        segundo = gerador.randint(1, professores)
+                        if segundo != ministrantes[0]:
+                            ministrantes.append(segundo)
+
+                    if formato == 'longo':
+                        for p in sorted(ministrantes):
+                            escritor.writerow(linha + [f'Prof {p}'])
+                    else:
+                        colunas = ['0'] * professores
+                        for p in ministrantes:
+                            colunas[p - 1] = '1'
+                        escritor.writerow(linha + colunas)
+
+    return caminho
+
+def executar_benchmark(tamanhos: List[int] = (500, 1000, 2000), periodos: int = 4, disciplinas_por_periodo: int = 5,
+                       compartilhamento: float = 0.08, memoria: bool = True, exportar: bool = True,
+                       semente: int = 42, caminho_relatorio: Optional[str] = None) -> List[Dict]:
+    """
+    Mede as etapas do pipeline em instâncias sintéticas de tamanhos crescentes.
+
+    Para cada tamanho (quantidade aproximada de disciplinas) gera uma instância com
+    gerarInstanciaSintetica (um professor para cada três disciplinas) e mede, com um
+    PerfilExecucao, o carregamento, a lista de adjacência, colorirGrafo, colorirGrafoDSatur,
+    a alocação de horários e os exportadores (CSV, planilha consolidada completa e só com a
+    aba Global). Os arquivos ficam em um diretório temporário.
+
+    Os tamanhos padrão são os que alocarHorariosEmparelhamento consegue agendar com a
+    semente padrão (a partir de cerca de 4000 disciplinas as classes de cor do DSatur não
+    cabem nos horários). Quando a alocação falha, o relatório traz 'alocado': False, um aviso é
+    impresso e os exportadores não são medidos.
+
+    Args:
+        tamanhos: Quantidades aproximadas de disciplinas de cada instância
+        periodos: Períodos por curso
+        disciplinas_por_periodo: Disciplinas por turma
+        compartilhamento: Probabilidade de uma disciplina ter dois professores
+        memoria: Mede o pico de memória de cada etapa (tracemalloc deixa tudo mais lento)
+        exportar: Inclui os exportadores
+        semente: Semente das instâncias
+        caminho_relatorio: Se informado, grava os resultados em JSON
+
+    Returns:
+        Uma entrada por tamanho com etapas, contadores e vazão (nós por segundo) por etapa
+    """
+    resultados = []
+    diretorio_original = os.getcwd()
+
+    for tamanho in tamanhos:
+        cursos = max(2, round(tamanho / (periodos * disciplinas_por_periodo)))
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho_csv = gerarInstanciaSintetica(
+                os.path.join(diretorio, "instancia.csv"), cursos=cursos, periodos=periodos,
+                disciplinas_por_periodo=disciplinas_por_periodo,
+                professores=max(2, cursos * periodos * disciplinas_por_periodo // 3),
+                compartilhamento=compartilhamento, semente=semente)
+
+            perfil = PerfilExecucao(memoria=memoria)
+            with perfil.etapa('carregamento'):
+                tabela = carregarTabelaDisciplinas(caminho_csv)
+            nos = tabela.nos
+            with perfil.etapa('lista_adjacencia'):
+                arestas = criarListaAdjacencia(nos, tabela)
+            perfil.definir('disciplinas', len({(no.turma, no.codigo) for no in nos}))
+            perfil.definir('nos', len(nos))
+            perfil.definir('arestas', sum(len(vizinhos) for vizinhos in arestas.values()) // 2)
+
+            with perfil.etapa('colorirGrafo'):
+                perfil.definir('cores_colorirGrafo', colorirGrafo(nos, arestas))
+            with perfil.etapa('colorirGrafoDSatur'):
+                perfil.definir('cores_colorirGrafoDSatur', colorirGrafoDSatur(nos, arestas))
+
+            with perfil.etapa('alocacao_horarios'):
+                horarios = alocarHorariosEmparelhamento(nos, arestas, tabela=tabela)
+            perfil.definir('alocado', horarios is not None)
+
+            # Sem alocação (mais cores que horários), os exportadores não têm o que escrever
+            if exportar and horarios is not None:
+                os.chdir(diretorio)
+                try:
+                    with perfil.etapa('exportacao_csv'):
+                        exportar_horarios(horarios, nos)
+                    with perfil.etapa('planilha_consolidada'):
+                        exportar_planilha_consolidada(horarios, nos)
+                    with perfil.etapa('planilha_consolidada_global'):
+                        exportar_planilha_consolidada(horarios, nos, os.path.join("controle", "horarios_global.xlsx"),
+                                                      abas_por_entidade=False)
+                finally:
+                    os.chdir(diretorio_original)
+
+            relatorio = perfil.relatorio()
+            perfil.salvar(os.path.join(diretorio, "perfil.json"))
+
+        relatorio['vazao_nos_por_segundo'] = {nome: len(nos) / etapa['tempo'] if etapa['tempo'] else None
+                                              for nome, etapa in relatorio['etapas'].items()}
+        resultados.append(relatorio)
+
+        contadores = relatorio['contadores']
+        print(f"{contadores['disciplinas']} disciplinas, {len(nos)} nós, {contadores['arestas']} arestas, "
+              f"{contadores['cores_colorirGrafoDSatur']} cores (DSatur), "
+              f"{'alocado' if contadores['alocado'] else 'sem alocação'}")
+        for nome, etapa in relatorio['etapas'].items():
+            print(f"  {nome:<27} {etapa['tempo']:9.4f} s  {etapa['pico_memoria'] / 1024:10.1f} KiB  "
+                  f"{relatorio['vazao_nos_por_segundo'][nome] or 0:12.0f} nós/s")
+        if not contadores['alocado']:
+            print(f"  AVISO: nenhuma alocação de horários para as {contadores['cores_colorirGrafoDSatur']} cores "
+                  f"do DSatur; a instância de {tamanho} disciplinas não foi agendada"
+                  + (" e os exportadores não foram medidos" if exportar else ""))
+
+    if caminho_relatorio is not None:
+        with open(caminho_relatorio, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    return resultados
+
+
+if __name__ == "__main__":
+    configurar_log()
+    executar_benchmark(caminho_relatorio="benchmark.json")
@@ -1,4 +1,7 @@
 class Disciplina():
+    # __slots__ evita um __dict__ por nó; os laços críticos usam a TabelaDisciplinas
+    __slots__ = ('indice', 'codigo', 'nome', 'curso', 'ppc', 'periodo', 'ch', 'professores', 'turma', 'cor', 'horario')
+
     def __init__(self, indice: int , curso: str, ppc: str, periodo: str, codigo: str, nome: str, ch: int, professores: list[int]):
         self.indice = indice
         self.codigo = codigo
@@ -11,4 +14,4 @@ class Disciplina():
 
         self.turma = curso + '-' + ppc + '.' + str(periodo)
         self.cor = None 
-        self.horario = None
\ No newline at end of file
+        self.horario = None
@@ -0,0 +1,130 @@
+import cProfile
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+
+class PerfilExecucao():
+    """
+    Instrumentação por etapa do pipeline de agendamento.
+
+    Cada etapa registra tempo de relógio, tempo de CPU e pico de memória (tracemalloc).
+    Etapas com o mesmo nome, como a alocação de horários repetida a cada tentativa, são
+    somadas em uma só entrada com a quantidade de chamadas. Contadores (nós, arestas,
+    cores, tentativas...) ficam em self.contadores. Com perfilar=True, cada etapa roda
+    sob o cProfile e as estatísticas da etapa mais lenta são gravadas junto do relatório.
+
+    Um perfil com ativo=False não mede nada, então as funções instrumentadas podem
+    recebê-lo sempre.
+
+    Etapas podem ser aninhadas. O tracemalloc tem um único pico global, que cada etapa
+    zera ao começar; o pico que as etapas externas já tinham atingido fica em uma pilha e
+    é combinado com o das internas quando elas terminam, então o pico de uma etapa inclui
+    o das etapas dentro dela. Só a etapa mais externa roda sob o cProfile (um único
+    profiler pode estar ativo por vez), e as estatísticas dela já incluem as internas.
+    """
+
+    def __init__(self, ativo: bool = True, memoria: bool = True, perfilar: bool = False):
+        self.ativo = ativo
+        self.memoria = ativo and memoria
+        self.perfilar = ativo and perfilar
+        self.etapas = {}
+        self.contadores = {}
+        self.inicio = time.time()
+
+        # Etapa mais lenta perfilada até agora: (tempo, nome, profiler)
+        self.mais_lenta = None
+        # Pico de memória (absoluto) de cada etapa aberta, da mais externa para a mais interna
+        self._picos = []
+        self._perfilando = False
+
+        self._iniciou_tracemalloc = False
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """Mede o bloco with como a etapa nome."""
+        if not self.ativo:
+            yield
+            return
+
+        if self.memoria:
+            memoria_inicial, pico = tracemalloc.get_traced_memory()
+            if self._picos:
+                # Guarda o pico da etapa externa antes de zerá-lo
+                self._picos[-1] = max(self._picos[-1], pico)
+            tracemalloc.reset_peak()
+            self._picos.append(memoria_inicial)
+        profiler = cProfile.Profile() if self.perfilar and not self._perfilando else None
+        inicio_cpu = time.process_time()
+        inicio = time.perf_counter()
+        if profiler is not None:
+            self._perfilando = True
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._perfilando = False
+            tempo = time.perf_counter() - inicio
+            tempo_cpu = time.process_time() - inicio_cpu
+
+            registro = self.etapas.setdefault(nome, {'chamadas': 0, 'tempo': 0.0, 'tempo_cpu': 0.0,
+                                                     'pico_memoria': 0})
+            registro['chamadas'] += 1
+            registro['tempo'] += tempo
+            registro['tempo_cpu'] += tempo_cpu
+            if self.memoria:
+                pico = max(self._picos.pop(), tracemalloc.get_traced_memory()[1])
+                if self._picos:
+                    self._picos[-1] = max(self._picos[-1], pico)
+                registro['pico_memoria'] = max(registro['pico_memoria'], pico - memoria_inicial)
+
+            if profiler is not None and (self.mais_lenta is None or tempo > self.mais_lenta[0]):
+                self.mais_lenta = (tempo, nome, profiler)
+
+    def contar(self, nome: str, valor: int = 1):
+        """Soma valor ao contador nome."""
+        if self.ativo:
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def definir(self, nome: str, valor):
+        """Define o valor do contador nome."""
+        if self.ativo:
+            self.contadores[nome] = valor
+
+    def relatorio(self) -> dict:
+        return {
+            'inicio': self.inicio,
+            'tempo_total': time.time() - self.inicio,
+            'etapas': self.etapas,
+            'contadores': self.contadores,
+            'etapa_mais_lenta': max(self.etapas, key=lambda e: self.etapas[e]['tempo'], default=None),
+        }
+
+    def salvar(self, caminho: str, caminho_perfil: Optional[str] = None):
+        """
+        Grava o relatório em JSON e, se perfilar=True, as estatísticas do cProfile da etapa
+        mais lenta (padrão: caminho com extensão .prof, legível com pstats).
+        """
+        if not self.ativo:
+            return
+
+        relatorio = self.relatorio()
+        if self.mais_lenta is not None:
+            if caminho_perfil is None:
+                caminho_perfil = caminho.rsplit('.', 1)[0] + '.prof'
+            self.mais_lenta[2].dump_stats(caminho_perfil)
+            relatorio['perfil'] = {'etapa': self.mais_lenta[1], 'arquivo': caminho_perfil}
+
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
@@ -0,0 +1,29 @@
+class ResultadoAgendamento():
+    def __init__(self, horarios: list = None, nos: list = None):
+        self.horarios = horarios  # melhor agendamento válido encontrado (ou None)
+        self.nos = nos
+        self.tentativas = 0
+        self.cores = None
+        self.cores_construcao = None  # cores antes do pós-processamento
+        self.pos_processamento = None
+        self.limite_inferior = None  # tamanho de uma clique maximal do grafo de conflitos
+        self.horarios_usados = None
+        self.estrategia = None
+        self.semente = None
+        self.tempo_primeira_solucao = None  # segundos até o primeiro agendamento válido
+        self.tempo_total = None
+
+    @property
+    def valido(self) -> bool:
+        return self.horarios is not None
+
+    @property
+    def lacuna(self):
+        """Diferença entre as cores usadas e o limite inferior (0 significa ótimo)."""
+        if self.cores is None or self.limite_inferior is None:
+            return None
+        return self.cores - self.limite_inferior
+
+    def __repr__(self):
+        return (f"ResultadoAgendamento(valido={self.valido}, tentativas={self.tentativas}, "
+                f"cores={self.cores}, lacuna={self.lacuna}, tempo_primeira_solucao={self.tempo_primeira_solucao})")
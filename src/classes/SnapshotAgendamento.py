@@ -0,0 +1,230 @@
+import os
+import struct
+import zipfile
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from classes.Disciplina import Disciplina
+from classes.TabelaDisciplinas import TabelaDisciplinas
+
+# numpy só é importado ao abrir ou gravar um snapshot, para que importar a classe (e o
+# main.py) não pague o tempo de importação dele
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class SnapshotAgendamento():
+    """
+    Snapshot binário (.npz sem compressão) de uma instância carregada e do seu agendamento.
+
+    Guarda a tabela de nós internada, a lista de adjacência em formato CSR (indptr/indices),
+    os professores de cada nó também em CSR, a cor e o rótulo de horário de cada nó e a
+    grade de horários. Os textos (nomes de cursos e turmas, PPC, período, código, nome,
+    rótulo de horário e turnos) ficam em uma única tabela de strings: os bytes UTF-8 de
+    todas elas em textos_dados e o início de cada uma em textos_indptr. As colunas de
+    texto guardam ids int32 nessa tabela, então todos os arrays são numéricos.
+
+    Os arrays são lidos só quando acessados, mapeados direto do arquivo com np.memmap
+    (somente leitura, sem cópia). O np.load ignora mmap_mode em arquivos .npz, então a
+    posição de cada array dentro do zip, que é gravado sem compressão, é calculada a partir
+    dos cabeçalhos do zip e do .npy. vizinhos() e professores() devolvem fatias desses
+    arrays, então validadores, exportadores e análises podem partir de um agendamento
+    resolvido sem recarregar o CSV nem refazer a adjacência.
+
+    O arquivo fica aberto enquanto o snapshot é usado; use-o como gerenciador de contexto
+    (with SnapshotAgendamento(caminho) as snapshot) ou chame fechar() ao terminar. Arrays já
+    acessados continuam disponíveis depois de fechar().
+    """
+    # Valores da grade de horários: turno sem disciplina e turno ausente do dicionário do dia
+    SEM_COR = -1
+    SEM_TURNO = -2
+
+    def __init__(self, caminho: str):
+        import numpy as np
+
+        self.caminho = os.path.abspath(caminho)
+        self.arquivo = np.load(self.caminho, allow_pickle=False)
+        self.fechado = False
+        # Tabela de strings decodificada no primeiro acesso a uma coluna de texto
+        self._textos = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        """Fecha o arquivo .npz."""
+        self.arquivo.close()
+        self.fechado = True
+
+    def __getattr__(self, nome: str):
+        # Acesso aos arrays como atributos (snapshot.cor, snapshot.adj_indices, ...)
+        arquivo = self.__dict__.get('arquivo')
+        if arquivo is not None and nome in arquivo.files:
+            if self.fechado:
+                raise ValueError(f"O array {nome} não foi lido antes de fechar o snapshot")
+            valor = self._mapear(nome)
+            setattr(self, nome, valor)
+            return valor
+        raise AttributeError(nome)
+
+    def _mapear(self, nome: str) -> "np.ndarray":
+        import numpy as np
+
+        info = self.arquivo.zip.getinfo(nome + ".npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            return self.arquivo[nome]
+        with open(self.caminho, 'rb') as f:
+            # Cabeçalho local do zip: 30 bytes fixos, terminados pelos tamanhos do nome e do campo extra
+            f.seek(info.header_offset)
+            tamanho_nome, tamanho_extra = struct.unpack('<HH', f.read(30)[26:])
+            f.seek(info.header_offset + 30 + tamanho_nome + tamanho_extra)
+            versao = np.lib.format.read_magic(f)
+            if versao == (1, 0):
+                forma, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            elif versao == (2, 0):
+                forma, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            else:
+                return self.arquivo[nome]
+            inicio = f.tell()
+        # O np.memmap não mapeia arrays vazios
+        if dtype.hasobject or not forma or 0 in forma:
+            return self.arquivo[nome]
+        return np.memmap(self.caminho, dtype=dtype, mode='r', offset=inicio, shape=forma,
+                         order='F' if fortran else 'C')
+
+    def textos(self, nome: str) -> List[str]:
+        """Strings de uma coluna de texto ('nomes_cursos', 'ppc', 'nome', 'turnos', ...)."""
+        if 'textos_indptr' not in self.arquivo.files:
+            # Snapshots gravados antes da tabela de strings guardam as colunas como arrays de unicode
+            return getattr(self, nome).tolist()
+        if self._textos is None:
+            dados = self.textos_dados.tobytes()
+            indptr = self.textos_indptr.tolist()
+            self._textos = [dados[indptr[k]:indptr[k + 1]].decode('utf-8') for k in range(len(indptr) - 1)]
+        return [self._textos[i] for i in getattr(self, nome).tolist()]
+
+    def __len__(self):
+        return len(self.curso)
+
+    @staticmethod
+    def salvar(caminho: str, nos: List[Disciplina], arestas: Dict, horarios: Optional[List[Dict]] = None,
+               tabela: Optional[TabelaDisciplinas] = None, turnos: Optional[List[str]] = None):
+        """
+        Grava o snapshot de nos, arestas e (opcionalmente) horarios.
+
+        Args:
+            caminho: Arquivo .npz de destino
+            nos: Lista de objetos Disciplina
+            arestas: Lista de adjacência (índice -> vizinhos)
+            horarios: Grade de horários (um dicionário turno -> cor por dia), se houver
+            tabela: TabelaDisciplinas de nos, se já tiver sido montada
+            turnos: Ordem dos turnos nas colunas da grade (obrigatória se horarios for dado)
+        """
+        import numpy as np
+
+        if tabela is None:
+            tabela = TabelaDisciplinas(nos)
+        n = len(nos)
+
+        adj_indptr = np.zeros(n + 1, dtype=np.int64)
+        for i in range(n):
+            adj_indptr[i + 1] = adj_indptr[i] + len(arestas[i])
+        adj_indices = np.fromiter((j for i in range(n) for j in sorted(arestas[i])),
+                                  dtype=np.int32, count=int(adj_indptr[-1]))
+
+        ids_professores = {p: k for k, p in enumerate(tabela.numeros_professores)}
+        prof_indptr = np.zeros(n + 1, dtype=np.int64)
+        for i, no in enumerate(nos):
+            prof_indptr[i + 1] = prof_indptr[i] + len(no.professores)
+        prof_indices = np.fromiter((ids_professores[p] for no in nos for p in no.professores),
+                                   dtype=np.int32, count=int(prof_indptr[-1]))
+
+        # Tabela de strings: cada texto distinto recebe um id na ordem em que aparece
+        ids_textos = {}
+
+        def internar(textos) -> "np.ndarray":
+            return np.array([ids_textos.setdefault(texto, len(ids_textos)) for texto in textos], dtype=np.int32)
+
+        arrays = {
+            'nomes_cursos': internar(tabela.nomes_cursos),
+            'nomes_turmas': internar(tabela.nomes_turmas),
+            'numeros_professores': np.array(tabela.numeros_professores, dtype=np.int32),
+            'curso': np.array(tabela.curso, dtype=np.int32),
+            'turma': np.array(tabela.turma, dtype=np.int32),
+            'ch': np.array(tabela.ch, dtype=np.int8),
+            'noturno': np.array(tabela.noturno, dtype=bool),
+            'ppc': internar(no.ppc for no in nos),
+            'periodo': internar(str(no.periodo) for no in nos),
+            'codigo': internar(no.codigo for no in nos),
+            'nome': internar(no.nome for no in nos),
+            'prof_indptr': prof_indptr,
+            'prof_indices': prof_indices,
+            'adj_indptr': adj_indptr,
+            'adj_indices': adj_indices,
+            'cor': np.array([SnapshotAgendamento.SEM_COR if no.cor is None else no.cor for no in nos],
+                            dtype=np.int32),
+            'horario': internar(no.horario or '' for no in nos),
+        }
+
+        if horarios is not None:
+            grade = np.full((len(horarios), len(turnos)), SnapshotAgendamento.SEM_TURNO, dtype=np.int32)
+            for dia, turnos_dia in enumerate(horarios):
+                for t, turno in enumerate(turnos):
+                    if turno in turnos_dia:
+                        cor = turnos_dia[turno]
+                        grade[dia, t] = SnapshotAgendamento.SEM_COR if cor is None else cor
+            arrays['grade'] = grade
+            arrays['turnos'] = internar(turnos)
+
+        dados = [texto.encode('utf-8') for texto in ids_textos]
+        textos_indptr = np.zeros(len(dados) + 1, dtype=np.int64)
+        np.cumsum([len(texto) for texto in dados], out=textos_indptr[1:])
+        arrays['textos_dados'] = np.frombuffer(b''.join(dados), dtype=np.uint8)
+        arrays['textos_indptr'] = textos_indptr
+
+        np.savez(caminho, **arrays)
+
+    def vizinhos(self, i: int) -> "np.ndarray":
+        """Vizinhos do nó i (fatia do CSR, sem cópia)."""
+        return self.adj_indices[self.adj_indptr[i]:self.adj_indptr[i + 1]]
+
+    def professores(self, i: int) -> "np.ndarray":
+        """Ids internados dos professores do nó i (fatia do CSR, sem cópia)."""
+        return self.prof_indices[self.prof_indptr[i]:self.prof_indptr[i + 1]]
+
+    def lista_adjacencia(self) -> Dict[int, set]:
+        """Converte o CSR para o dicionário índice -> vizinhos usado pelos algoritmos de coloração."""
+        indptr = self.adj_indptr.tolist()
+        indices = self.adj_indices.tolist()
+        return {i: set(indices[indptr[i]:indptr[i + 1]]) for i in range(len(self))}
+
+    def disciplinas(self) -> List[Disciplina]:
+        """Reconstrói os objetos Disciplina, com cor e horário, para os exportadores."""
+        numeros = self.numeros_professores.tolist()
+        prof_indptr = self.prof_indptr.tolist()
+        prof_indices = self.prof_indices.tolist()
+        cursos = self.textos('nomes_cursos')
+
+        nos = []
+        for i, (curso, ppc, periodo, codigo, nome, ch, cor, horario) in enumerate(zip(
+                self.curso.tolist(), self.textos('ppc'), self.textos('periodo'), self.textos('codigo'),
+                self.textos('nome'), self.ch.tolist(), self.cor.tolist(), self.textos('horario'))):
+            professores = [numeros[p] for p in prof_indices[prof_indptr[i]:prof_indptr[i + 1]]]
+            no = Disciplina(i, cursos[curso], ppc, periodo, codigo, nome, ch, professores)
+            no.cor = None if cor == self.SEM_COR else cor
+            no.horario = horario or None
+            nos.append(no)
+        return nos
+
+    def horarios(self) -> Optional[List[Dict]]:
+        """Reconstrói a grade de horários (um dicionário turno -> cor por dia), se houver."""
+        if 'grade' not in self.arquivo.files:
+            return None
+        turnos = self.textos('turnos')
+        horarios = []
+        for linha in self.grade.tolist():
+            horarios.append({turno: (None if cor == self.SEM_COR else cor)
+                             for turno, cor in zip(turnos, linha) if cor != self.SEM_TURNO})
+        return horarios
@@ -0,0 +1,86 @@
+from typing import Iterable
+
+from classes.Disciplina import Disciplina
+
+
+class TabelaDisciplinas():
+    """
+    Representação colunar (struct-of-arrays) dos nós do grafo.
+
+    Cursos, turmas e professores são internados como inteiros, e os professores de cada
+    disciplina ficam em uma máscara de bits (bit b ligado = professor de id b). Os objetos
+    Disciplina continuam em self.nos como visão para os exportadores; cor e horário, que
+    mudam a cada tentativa, ficam neles.
+
+    Aceita qualquer iterável de nós, inclusive o gerador de iterarDisciplinasCsv, e monta a
+    tabela e os índices invertidos na mesma passada da leitura.
+    """
+    __slots__ = ('nos', 'nomes_cursos', 'nomes_turmas', 'numeros_professores',
+                 'curso', 'turma', 'mascara_professores', 'ch', 'noturno',
+                 'nos_por_turma', 'nos_por_professor')
+
+    def __init__(self, nos: Iterable[Disciplina]):
+        self.nos = []
+
+        # id -> valor original
+        self.nomes_cursos = []
+        self.nomes_turmas = []
+        self.numeros_professores = []
+
+        # Uma posição por nó
+        self.curso = []
+        self.turma = []
+        self.mascara_professores = []
+        self.ch = []
+        self.noturno = []
+
+        # Índices invertidos: id -> nós
+        self.nos_por_turma = []
+        self.nos_por_professor = []
+
+        ids_cursos = {}
+        ids_turmas = {}
+        ids_professores = {}
+
+        for i, no in enumerate(nos):
+            self.nos.append(no)
+
+            curso = ids_cursos.get(no.curso)
+            if curso is None:
+                curso = ids_cursos[no.curso] = len(self.nomes_cursos)
+                self.nomes_cursos.append(no.curso)
+
+            turma = ids_turmas.get(no.turma)
+            if turma is None:
+                turma = ids_turmas[no.turma] = len(self.nomes_turmas)
+                self.nomes_turmas.append(no.turma)
+                self.nos_por_turma.append([])
+            self.nos_por_turma[turma].append(i)
+
+            mascara = 0
+            for p in no.professores:
+                professor = ids_professores.get(p)
+                if professor is None:
+                    professor = ids_professores[p] = len(self.numeros_professores)
+                    self.numeros_professores.append(p)
+                    self.nos_por_professor.append([])
+                self.nos_por_professor[professor].append(i)
+                mascara |= 1 << professor
+
+            self.curso.append(curso)
+            self.turma.append(turma)
+            self.mascara_professores.append(mascara)
+            self.ch.append(no.ch)
+            self.noturno.append(no.curso == 'SIN')
+
+    def __len__(self):
+        return len(self.nos)
+
+    def professores_da_mascara(self, mascara: int) -> list[int]:
+        """Converte uma máscara de bits de volta para os números dos professores."""
+        professores = []
+        while mascara:
+            bit = mascara & -mascara
+            professores.append(self.numeros_professores[bit.bit_length() - 1])
+            mascara ^= bit
+        return professores
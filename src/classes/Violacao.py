@@ -0,0 +1,11 @@
+class Violacao():
+    def __init__(self, tipo: str, mensagem: str, dia: int = None, turno: str = None, chave=None, disciplinas: list = None):
+        self.tipo = tipo  # 'professor', 'turma' ou 'curso'
+        self.mensagem = mensagem
+        self.dia = dia
+        self.turno = turno
+        self.chave = chave  # professor, turma ou curso envolvido
+        self.disciplinas = disciplinas if disciplinas is not None else []
+
+    def __repr__(self):
+        return f"Violacao({self.tipo!r}, {self.mensagem!r})"
@@ -1,87 +1,178 @@
+import argparse
+import copy
 import csv
+import filecmp
+import hashlib
+import heapq
+import json
 import os
 import random
+import shutil
+import sys
 import logging
-import networkx as nx
-import matplotlib.pyplot as plt
-from collections import defaultdict
-from typing import List, Dict, Optional
-import openpyxl
-from openpyxl.styles import PatternFill, Font, Alignment
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Iterator, Optional, Tuple, TYPE_CHECKING
 
 from classes.Disciplina import Disciplina
+from classes.TabelaDisciplinas import TabelaDisciplinas
+from classes.Violacao import Violacao
+from classes.ResultadoAgendamento import ResultadoAgendamento
+from classes.SnapshotAgendamento import SnapshotAgendamento
+from classes.PerfilExecucao import PerfilExecucao
+
+# networkx, matplotlib e openpyxl só são importados nas funções que os usam, para que uma
+# execução que gera apenas os CSVs não pague o tempo de importação deles
+if TYPE_CHECKING:
+    import networkx as nx
+    import openpyxl
+    from openpyxl.styles import NamedStyle
+    from openpyxl.styles.cell_style import StyleArray
+
+ARQUIVO_LOG = "erros_agendamento.log"
+
+def configurar_log(caminho: str = ARQUIVO_LOG) -> None:
+    """
+    Direciona os erros do agendamento para o arquivo de log.
 
-logging.basicConfig(filename='erros_agendamento.log', level=logging.ERROR,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+    Chamada pela linha de comando, e não na importação, para que quem só importa o módulo
+    (os testes, o benchmark) não crie o arquivo no diretório atual.
+
+    Args:
+        caminho (str): Arquivo que recebe as mensagens de erro.
+    """
+    logging.basicConfig(filename=caminho, level=logging.ERROR,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+def validar_agendamento(horarios: List[Dict], nos: List[Disciplina],
+                        tabela: Optional[TabelaDisciplinas] = None) -> List[Violacao]:
+    """
+    Valida um agendamento em uma única passada e retorna todas as violações encontradas.
+
+    Um índice cor -> disciplinas é montado uma vez, junto com a verificação de turno do
+    curso (SIN à noite, CCO de dia). Depois cada horário da semana consulta o índice
+    para checar conflitos de professor (por máscaras de bits) e de turma (por ids
+    internados), sem reler a lista de nós.
+
+    Args:
+        horarios: Lista com um dicionário turno -> cor para cada dia da semana
+        nos: Lista de objetos Disciplina
+        tabela: TabelaDisciplinas de nos, se já tiver sido montada
+
+    Returns:
+        Lista de objetos Violacao (vazia se o agendamento for válido)
+    """
+    if tabela is None:
+        tabela = TabelaDisciplinas(nos)
+    violacoes = []
+
+    # Índice cor -> disciplinas e restrições de curso no mesmo laço
+    disciplinas_por_cor = defaultdict(list)
+    for i, disciplina in enumerate(nos):
+        disciplinas_por_cor[disciplina.cor].append(i)
+
+        if disciplina.curso == 'SIN' and disciplina.horario and not disciplina.horario.startswith('N'):
+            violacoes.append(Violacao('curso', f"Disciplina de SIN {disciplina.nome} não agendada à noite",
+                                      turno=disciplina.horario, chave='SIN', disciplinas=[disciplina]))
+
+        if disciplina.curso == 'CCO' and disciplina.horario and disciplina.horario.startswith('N'):
+            violacoes.append(Violacao('curso', f"Disciplina de CCO {disciplina.nome} agendada à noite",
+                                      turno=disciplina.horario, chave='CCO', disciplinas=[disciplina]))
+
+    mascaras = tabela.mascara_professores
+    turmas = tabela.turma
 
-def verificar_restricoes_professor(horarios: List[Dict], nos: List[Disciplina]) -> bool:
-    horarios_professores = defaultdict(lambda: defaultdict(list))
-    
     for dia in range(len(horarios)):
         for turno, cor in horarios[dia].items():
-            if cor is not None:
-                # Encontrar disciplinas com esta cor
-                disciplinas_no_turno = [no for no in nos if no.cor == cor]
-                
-                # Verificar horário de cada professor
-                for disciplina in disciplinas_no_turno:
-                    for prof in disciplina.professores:
-                        horarios_professores[prof][f"{dia}_{turno}"].append(disciplina)
-                        
-                        # Verificar se professor tem mais de uma disciplina no mesmo horário
-                        if len(horarios_professores[prof][f"{dia}_{turno}"]) > 1:
-                            logging.error(f"Professor {prof} tem múltiplas disciplinas em {dia}_{turno}")
-                            return False
-    
-    return True
+            if cor is None:
+                continue
+
+            membros = disciplinas_por_cor.get(cor, ())
+            professores_ocupados = 0
+            professores_em_conflito = 0
+            turmas_ocupadas = set()
+            turmas_em_conflito = []
+            for i in membros:
+                professores_em_conflito |= professores_ocupados & mascaras[i]
+                professores_ocupados |= mascaras[i]
+                if turmas[i] in turmas_ocupadas and turmas[i] not in turmas_em_conflito:
+                    turmas_em_conflito.append(turmas[i])
+                turmas_ocupadas.add(turmas[i])
+
+            # Verificar se professor tem mais de uma disciplina no mesmo horário
+            for prof in tabela.professores_da_mascara(professores_em_conflito):
+                disciplinas = [nos[i] for i in membros if prof in nos[i].professores]
+                violacoes.append(Violacao('professor', f"Professor {prof} tem múltiplas disciplinas em {dia}_{turno}",
+                                          dia, turno, prof, disciplinas))
+
+            # Verificar se turma tem múltiplas disciplinas no mesmo horário
+            for turma in turmas_em_conflito:
+                disciplinas = [nos[i] for i in membros if turmas[i] == turma]
+                chave_turma = (disciplinas[0].turma, disciplinas[0].curso, disciplinas[0].periodo)
+                violacoes.append(Violacao('turma', f"Turma {chave_turma} tem múltiplas disciplinas em {dia}_{turno}",
+                                          dia, turno, chave_turma, disciplinas))
+
+    return violacoes
+
+def _registrar_violacoes(violacoes: List[Violacao]) -> bool:
+    for violacao in violacoes:
+        logging.error(violacao.mensagem)
+    return not violacoes
+
+def violacoesPorTipo(horarios: List[Dict], nos: List[Disciplina]) -> Dict[str, List[Violacao]]:
+    """
+    Violações de validar_agendamento separadas por tipo ('professor', 'turma', 'curso').
+
+    Nada é guardado entre chamadas: quem precisa dos três tipos deve chamar
+    validar_agendamento uma vez, em vez das três funções verificar_*.
+    """
+    por_tipo = {'professor': [], 'turma': [], 'curso': []}
+    for violacao in validar_agendamento(horarios, nos):
+        por_tipo[violacao.tipo].append(violacao)
+    return por_tipo
+
+def verificar_restricoes_professor(horarios: List[Dict], nos: List[Disciplina]) -> bool:
+    return _registrar_violacoes(violacoesPorTipo(horarios, nos)['professor'])
 
 def verificar_restricoes_turma(horarios: List[Dict], nos: List[Disciplina]) -> bool:
-    horarios_turmas = defaultdict(lambda: defaultdict(list))
-    
-    for dia in range(len(horarios)):
-        for turno, cor in horarios[dia].items():
-            if cor is not None:
-                # Encontrar disciplinas com esta cor
-                disciplinas_no_turno = [no for no in nos if no.cor == cor]
-                
-                # Verificar horário de cada turma
-                for disciplina in disciplinas_no_turno:
-                    chave_turma = (disciplina.turma, disciplina.curso, disciplina.periodo)
-                    horarios_turmas[f"{dia}_{turno}"][chave_turma].append(disciplina)
-                    
-                    # Verificar se turma tem múltiplas disciplinas no mesmo horário
-                    if len(horarios_turmas[f"{dia}_{turno}"][chave_turma]) > 1:
-                        logging.error(f"Turma {chave_turma} tem múltiplas disciplinas em {dia}_{turno}")
-                        return False
-    
-    return True
+    return _registrar_violacoes(violacoesPorTipo(horarios, nos)['turma'])
 
 def verificar_restricoes_curso(horarios: List[Dict], nos: List[Disciplina]) -> bool:
-    for disciplina in nos:
-        if disciplina.curso == 'SIN' and disciplina.horario and not disciplina.horario.startswith('N'):
-            logging.error(f"Disciplina de SIN {disciplina.nome} não agendada à noite")
-            return False
-        
-        if disciplina.curso == 'CCO' and disciplina.horario and disciplina.horario.startswith('N'):
-            logging.error(f"Disciplina de CCO {disciplina.nome} agendada à noite")
-            return False
-    
-    return True
+    return _registrar_violacoes(violacoesPorTipo(horarios, nos)['curso'])
 
-def salvar_grafo_como_imagem(grafo: nx.Graph):
+# Resolução das imagens dos grafos e da prévia (--previa na linha de comando)
+DPI_IMAGEM = 300
+DPI_PREVIA = 72
+
+def _pyplot():
+    # O backend Agg só grava arquivos e não precisa de interface gráfica
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def salvar_grafo_como_imagem(grafo: "nx.Graph", caminho: str = "grafo_disciplina_curso.png", dpi: int = DPI_IMAGEM,
+                             diretorio_layouts: Optional[str] = None):
     """
     Saves the graph visualization with enhanced layout and styling.
     
     Args:
         grafo (nx.Graph): NetworkX graph to visualize
+        caminho: Arquivo de destino; a extensão (.png, .svg) define o formato
+        dpi: Resolução da imagem
+        diretorio_layouts: Cache de posições dos nós (padrão: DIRETORIO_LAYOUTS)
     """
+    import networkx as nx
+    plt = _pyplot()
+
     plt.figure(figsize=(15, 12))
     
     # Use different layout algorithms based on graph size
     if len(grafo) > 50:
-        pos = nx.spring_layout(grafo, k=0.8, iterations=50)
+        pos = layoutEmCache(grafo, 'spring_layout', {'k': 0.8, 'iterations': 50}, diretorio_layouts)
     else:
-        pos = nx.kamada_kawai_layout(grafo)
+        pos = layoutEmCache(grafo, 'kamada_kawai_layout', {}, diretorio_layouts)
     
     # Draw nodes by type with different colors
     node_colors = [grafo.nodes[node].get('color', 'gray') for node in grafo.nodes()]
@@ -129,21 +220,27 @@ def salvar_grafo_como_imagem(grafo: nx.Graph):
     plt.tight_layout()
     
     # Save with high resolution
-    plt.savefig("grafo_disciplina_curso.png", dpi=300, bbox_inches='tight')
+    plt.savefig(caminho, dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def salvar_grafo_restricoes_como_imagem(grafo: nx.Graph, caminho: str = "grafo_restricoes.png"):
+def salvar_grafo_restricoes_como_imagem(grafo: "nx.Graph", caminho: str = "grafo_restricoes.png", dpi: int = DPI_IMAGEM,
+                                        diretorio_layouts: Optional[str] = None):
     """
     Salva o grafo de restrições como uma imagem com cores e layout otimizado.
     
     Args:
         grafo: NetworkX Graph contendo o grafo de restrições
-        caminho: Caminho onde a imagem será salva
+        caminho: Caminho onde a imagem será salva; a extensão (.png, .svg) define o formato
+        dpi: Resolução da imagem
+        diretorio_layouts: Cache de posições dos nós (padrão: DIRETORIO_LAYOUTS)
     """
+    import networkx as nx
+    plt = _pyplot()
+
     plt.figure(figsize=(15, 12))
     
     # Usa um layout que minimiza o cruzamento de arestas
-    pos = nx.spring_layout(grafo, k=2, iterations=50)
+    pos = layoutEmCache(grafo, 'spring_layout', {'k': 2, 'iterations': 50}, diretorio_layouts)
     
     # Extrai as cores dos nós para visualização
     cores = [grafo.nodes[node]['cor'] for node in grafo.nodes()]
@@ -182,10 +279,10 @@ def salvar_grafo_restricoes_como_imagem(grafo: nx.Graph, caminho: str = "grafo_r
     plt.tight_layout()
     
     # Salva a imagem
-    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    plt.savefig(caminho, dpi=dpi, bbox_inches='tight')
     plt.close()
 
-def criar_grafo_disciplina_curso(nos: List[Disciplina]) -> nx.Graph:
+def criar_grafo_disciplina_curso(nos: List[Disciplina]) -> "nx.Graph":
     """
     Creates a comprehensive graph representing relationships between disciplines, courses, and professors.
     
@@ -202,6 +299,8 @@ def criar_grafo_disciplina_curso(nos: List[Disciplina]) -> nx.Graph:
         - Uses different node colors for different entity types
         - Includes edge weights based on relationships
     """
+    import networkx as nx
+
     G = nx.Graph()
     
     # Track unique entities
@@ -242,7 +341,7 @@ def criar_grafo_disciplina_curso(nos: List[Disciplina]) -> nx.Graph:
     
     return G
 
-def criar_grafo_coloracao_restricoes(nos: List[Disciplina], arestas: Dict) -> nx.Graph:
+def criar_grafo_coloracao_restricoes(nos: List[Disciplina], arestas: Dict) -> "nx.Graph":
     """
     Cria um grafo NetworkX que representa as restrições de coloração entre disciplinas.
     
@@ -253,6 +352,8 @@ def criar_grafo_coloracao_restricoes(nos: List[Disciplina], arestas: Dict) -> nx
     Returns:
         NetworkX Graph com as disciplinas e suas restrições
     """
+    import networkx as nx
+
     G = nx.Graph()
     
     # Adiciona nós com atributos
@@ -277,249 +378,1227 @@ def criar_grafo_coloracao_restricoes(nos: List[Disciplina], arestas: Dict) -> nx
     
     return G
 
-def exportar_horarios(horarios: List[Dict], nos: List[Disciplina]):
+CAMPOS_HORARIO = ['Curso', 'Período', 'Código da Disciplina', 'Nome da Disciplina',
+                  'Dia da Semana', 'Professor', 'Horário']
+CAMPOS_HORARIO_GLOBAL = ['Curso', 'Período', 'Código da Disciplina', 'Nome da Disciplina',
+                         'Dia da Semana', 'Professores', 'Horário']
+
+def indiceHorariosPorCor(horarios: List[Dict]) -> Dict[int, List[tuple]]:
+    """Índice cor -> [(dia, turno), ...], na ordem de dias e turnos da grade."""
+    indice = defaultdict(list)
+    for dia, turnos in enumerate(horarios):
+        for turno, cor in turnos.items():
+            if cor is not None:
+                indice[cor].append((dia, turno))
+    return indice
+
+# Pastas dos CSVs de horário por turma e por professor
+DIRETORIOS_HORARIOS_CSV = ("aluno/csv", "professor/csv")
+
+def _remover_horarios_orfaos(manter) -> List[str]:
+    """
+    Remove os CSVs de horário (horario_*.csv) de turmas e professores que não estão em manter,
+    ou seja, que não têm mais disciplinas no agendamento. Outros arquivos não são tocados.
+
+    Returns:
+        Caminhos removidos
+    """
+    manter = {os.path.normpath(caminho) for caminho in manter}
+    removidos = []
+    for diretorio in DIRETORIOS_HORARIOS_CSV:
+        if not os.path.isdir(diretorio):
+            continue
+        for nome_arquivo in os.listdir(diretorio):
+            caminho = os.path.normpath(os.path.join(diretorio, nome_arquivo))
+            if nome_arquivo.startswith("horario_") and nome_arquivo.endswith(".csv") and caminho not in manter:
+                os.remove(caminho)
+                removidos.append(caminho)
+    return removidos
+
+def _substituir_se_alterado(temporario: str, caminho: str) -> bool:
+    # Mantém o arquivo atual (e sua data de modificação) se o conteúdo novo for igual
+    if os.path.exists(caminho) and filecmp.cmp(temporario, caminho, shallow=False):
+        os.remove(temporario)
+        return False
+    os.replace(temporario, caminho)
+    return True
+
+def exportar_horarios(horarios: List[Dict], nos: List[Disciplina]) -> Dict[str, bool]:
+    """
+    Exporta os horários em CSV por turma, por professor e global.
+
+    Monta primeiro o índice cor -> (dia, turno) e percorre os nós uma única vez, mandando
+    cada linha para o arquivo da turma, os dos professores e o global por escritores CSV
+    abertos durante toda a exportação, sem guardar as linhas em memória. Cada arquivo é
+    escrito em um temporário e só substitui o atual se o conteúdo mudou. CSVs de turmas e
+    professores que ficaram sem disciplinas são removidos (_remover_horarios_orfaos).
+
+    Returns:
+        Dicionário caminho -> True se o arquivo foi gravado, False se já estava atualizado
+    """
     # Criar pastas se não existirem
     os.makedirs("professor/csv", exist_ok=True)
     os.makedirs("controle", exist_ok=True)
     os.makedirs("aluno/csv", exist_ok=True)
 
-    # Exportar horários por curso/turma
-    horarios_curso = defaultdict(list)
+    horarios_por_cor = indiceHorariosPorCor(horarios)
+    abertos = {}
 
-    for disciplina in nos:
-        chave_curso = f"{disciplina.curso}_{disciplina.periodo}"
-        for dia in range(5):  # Semana tem 5 dias
-            for turno in horarios[dia].keys():
-                if horarios[dia][turno] == disciplina.cor:
-                    horarios_curso[chave_curso].append({
-                        'Curso': disciplina.curso,
-                        'Período': disciplina.periodo,
-                        'Código da Disciplina': disciplina.codigo,
-                        'Nome da Disciplina': disciplina.nome,
-                        'Dia da Semana': dia + 1,  # Semana tem 5 dias uteis
-                        'Professor': ', '.join(map(str, disciplina.professores)),
-                        'Horário': turno
-                    })
-
-    # Escrever horários das turmas
-    for chave_curso, horario in horarios_curso.items():
-        with open(os.path.join("aluno/csv", f"horario_{chave_curso}.csv"), 'w', newline='', encoding='utf-8') as f:
-            escritor = csv.DictWriter(f, fieldnames=['Curso', 'Período', 'Código da Disciplina', 
-                                                     'Nome da Disciplina', 'Dia da Semana', 
-                                                     'Professor', 'Horário'])
-            escritor.writeheader()
-            escritor.writerows(horario)
-
-    # Exportar horários por professor
-    horarios_professores = defaultdict(list)
+    def escritor(caminho: str, campos: List[str]) -> csv.DictWriter:
+        if caminho not in abertos:
+            arquivo = open(caminho + ".tmp", 'w', newline='', encoding='utf-8')
+            escritor_csv = csv.DictWriter(arquivo, fieldnames=campos)
+            escritor_csv.writeheader()
+            abertos[caminho] = (arquivo, escritor_csv)
+        return abertos[caminho][1]
+
+    try:
+        caminho_global = os.path.join("controle", "horario_global.csv")
+        escritor_global = escritor(caminho_global, CAMPOS_HORARIO_GLOBAL)
 
-    for disciplina in nos:
-        for prof in disciplina.professores:
-            for dia in range(5):  # Semana tem 5 dias
-                for turno in horarios[dia].keys():
-                    if horarios[dia][turno] == disciplina.cor:
-                        horarios_professores[prof].append({
-                            'Curso': disciplina.curso,
-                            'Período': disciplina.periodo,
-                            'Código da Disciplina': disciplina.codigo,
-                            'Nome da Disciplina': disciplina.nome,
-                            'Dia da Semana': dia + 1,
-                            'Professor': prof,
-                            'Horário': turno
-                        })
-
-    # Escrever horários dos professores
-    for prof, horario in horarios_professores.items():
-        with open(os.path.join("professor/csv", f"horario_professor_{prof}.csv"), 'w', newline='', encoding='utf-8') as f:
-            escritor = csv.DictWriter(f, fieldnames=['Curso', 'Período', 'Código da Disciplina',
-                                                     'Nome da Disciplina', 'Dia da Semana',
-                                                     'Professor', 'Horário'])
-            escritor.writeheader()
-            escritor.writerows(horario)
-
-    # Horário global
-    with open(os.path.join("controle", "horario_global.csv"), 'w', newline='', encoding='utf-8') as f:
-        escritor = csv.DictWriter(f, fieldnames=['Curso', 'Período', 
-                                                 'Código da Disciplina', 
-                                                 'Nome da Disciplina', 
-                                                 'Dia da Semana', 
-                                                 'Professores', 
-                                                 'Horário'])
-        escritor.writeheader()
         for disciplina in nos:
-            for dia in range(5):
-                for turno in horarios[dia].keys():
-                    if horarios[dia][turno] == disciplina.cor:
-                        escritor.writerow({
-                            'Curso': disciplina.curso,
-                            'Período': disciplina.periodo,
-                            'Código da Disciplina': disciplina.codigo,
-                            'Nome da Disciplina': disciplina.nome,
-                            'Dia da Semana': dia + 1,
-                            'Professores': ', '.join(map(str, disciplina.professores)),
-                            'Horário': turno
-                        })
-
-def processo_agendamento_principal():
-    caminho_csv = os.path.join("..", "datasets", "csv", "semestre1.csv")
-    nos = carregarDisciplinasCsv(caminho_csv)
-    arestas = criarListaAdjacencia(nos)
+            alocacoes = horarios_por_cor.get(disciplina.cor)
+            if not alocacoes:
+                continue
+
+            escritor_turma = escritor(os.path.join("aluno/csv", f"horario_{disciplina.curso}_{disciplina.periodo}.csv"),
+                                      CAMPOS_HORARIO)
+            escritores_professores = [(prof, escritor(os.path.join("professor/csv", f"horario_professor_{prof}.csv"),
+                                                      CAMPOS_HORARIO))
+                                      for prof in disciplina.professores]
+            professores = ', '.join(map(str, disciplina.professores))
+
+            for dia, turno in alocacoes:
+                linha = {
+                    'Curso': disciplina.curso,
+                    'Período': disciplina.periodo,
+                    'Código da Disciplina': disciplina.codigo,
+                    'Nome da Disciplina': disciplina.nome,
+                    'Dia da Semana': dia + 1,  # Semana tem 5 dias uteis
+                    'Professor': professores,
+                    'Horário': turno
+                }
+                escritor_turma.writerow(linha)
+                for prof, escritor_professor in escritores_professores:
+                    linha['Professor'] = prof
+                    escritor_professor.writerow(linha)
+                del linha['Professor']
+                linha['Professores'] = professores
+                escritor_global.writerow(linha)
+    except BaseException:
+        for caminho, (arquivo, _) in abertos.items():
+            arquivo.close()
+            os.remove(caminho + ".tmp")
+        raise
+
+    for arquivo, _ in abertos.values():
+        arquivo.close()
+
+    gravados = {caminho: _substituir_se_alterado(caminho + ".tmp", caminho) for caminho in abertos}
+    for caminho in _remover_horarios_orfaos(gravados):
+        print(f"Arquivo {caminho} removido (sem disciplinas no agendamento)")
+    return gravados
+
+def renderizar_grafos(nos: List[Disciplina], arestas: Dict, diretorio: str = ".", formato: str = 'png',
+                      dpi: int = DPI_IMAGEM, diretorio_layouts: Optional[str] = None,
+                      perfil: Optional[PerfilExecucao] = None) -> List[str]:
+    """
+    Desenha o grafo de disciplinas e professores e o grafo de restrições.
+
+    Args:
+        nos: Lista de objetos Disciplina, já coloridos
+        arestas: Lista de adjacência (índice -> vizinhos)
+        diretorio: Diretório das imagens
+        formato: 'png' ou 'svg'
+        dpi: Resolução das imagens (DPI_PREVIA para uma prévia rápida)
+        diretorio_layouts: Cache de posições dos nós (padrão: DIRETORIO_LAYOUTS)
+        perfil: PerfilExecucao que mede cada imagem (padrão: None)
+
+    Returns:
+        Os caminhos das duas imagens
+    """
+    if perfil is None:
+        perfil = PerfilExecucao(ativo=False)
+    caminhos = [os.path.join(diretorio, f"grafo_disciplina_curso.{formato}"),
+                os.path.join(diretorio, f"grafo_restricoes.{formato}")]
+
+    # Criar e salvar o grafo de disciplinas e professores
+    with perfil.etapa('imagem_disciplina_curso'):
+        grafo_disciplina_curso = criar_grafo_disciplina_curso(nos)
+        salvar_grafo_como_imagem(grafo_disciplina_curso, caminhos[0], dpi, diretorio_layouts)
+
+    # Criar e salvar o grafo de restrições
+    with perfil.etapa('imagem_restricoes'):
+        grafo_restricoes = criar_grafo_coloracao_restricoes(nos, arestas)
+        salvar_grafo_restricoes_como_imagem(grafo_restricoes, caminhos[1], dpi, diretorio_layouts)
+
+    return caminhos
+
+# Processo único que desenha os grafos fora do caminho crítico, criado no primeiro uso
+_renderizador = None
+_renderizacoes_pendentes = []
+
+def renderizar_grafos_em_segundo_plano(nos: List[Disciplina], arestas: Dict, formato: str = 'png',
+                                       dpi: int = DPI_IMAGEM) -> Future:
+    """
+    Agenda renderizar_grafos em um processo separado e retorna sem esperar.
+
+    As imagens vão para o diretório atual no momento da chamada (os caminhos são passados
+    absolutos ao processo). aguardar_renderizacoes espera as renderizações pendentes.
+
+    Returns:
+        Future com os caminhos das imagens
+    """
+    global _renderizador
+    if _renderizador is None:
+        _renderizador = ProcessPoolExecutor(max_workers=1)
+    futuro = _renderizador.submit(renderizar_grafos, nos, arestas, os.path.abspath("."), formato, dpi,
+                                  os.path.abspath(DIRETORIO_LAYOUTS))
+    _renderizacoes_pendentes.append(futuro)
+    return futuro
+
+def aguardar_renderizacoes() -> List[str]:
+    """Espera as renderizações em segundo plano pendentes e retorna os caminhos das imagens."""
+    caminhos = []
+    while _renderizacoes_pendentes:
+        caminhos.extend(_renderizacoes_pendentes.pop(0).result())
+    return caminhos
+
+def _finalizar_agendamento(horarios: List[Dict], nos: List[Disciplina], arestas: Dict,
+                           perfil: Optional[PerfilExecucao] = None, gerar_imagens: bool = True,
+                           imagens_em_segundo_plano: bool = False, formato_imagem: str = 'png',
+                           dpi_imagem: int = DPI_IMAGEM) -> List[str]:
+    """
+    Gera as imagens, os CSVs e o estado salvo, e retorna os caminhos dos arquivos gerados.
+
+    Com gerar_imagens=False (modo headless) os grafos não são desenhados, e networkx e
+    matplotlib nem chegam a ser importados. Com imagens_em_segundo_plano=True eles são
+    desenhados em outro processo (renderizar_grafos_em_segundo_plano) e as imagens ficam
+    fora da lista retornada.
+    """
+    if perfil is None:
+        perfil = PerfilExecucao(ativo=False)
+
+    imagens = []
+    if gerar_imagens and imagens_em_segundo_plano:
+        renderizar_grafos_em_segundo_plano(nos, arestas, formato_imagem, dpi_imagem)
+    elif gerar_imagens:
+        imagens = renderizar_grafos(nos, arestas, formato=formato_imagem, dpi=dpi_imagem, perfil=perfil)
+        imagens = [os.path.basename(imagem) for imagem in imagens]
+
+    # Exportar horários
+    with perfil.etapa('exportacao_csv'):
+        arquivos = list(exportar_horarios(horarios, nos))
+    perfil.definir('arquivos_csv', len(arquivos))
+
+    with perfil.etapa('estado_e_snapshot'):
+        _salvar_estado_e_snapshot(horarios, nos, arestas)
+
+    return imagens + [ARQUIVO_ESTADO, ARQUIVO_SNAPSHOT] + arquivos
+
+def _salvar_estado_e_snapshot(horarios: List[Dict], nos: List[Disciplina], arestas: Dict,
+                              caminho_estado: Optional[str] = None, tabela: Optional[TabelaDisciplinas] = None):
+    # Estado usado pelo modo incremental na próxima execução
+    salvarEstadoAgendamento(nos, arestas, horarios, caminho_estado or ARQUIVO_ESTADO)
+    # Snapshot binário do agendamento resolvido, lido por export e render
+    SnapshotAgendamento.salvar(ARQUIVO_SNAPSHOT, nos, arestas, horarios, tabela=tabela, turnos=TURNOS)
+
+DIRETORIO_CACHE = "cache_agendamento"
+TAMANHO_MAXIMO_CACHE = 256 * 1024 * 1024
+# Posições dos nós dos grafos desenhados (layoutEmCache); cada layout conta como uma entrada no LRU do cache
+DIRETORIO_LAYOUTS = os.path.join(DIRETORIO_CACHE, "layouts")
+# Incrementar quando uma mudança no código alterar os resultados, para não reaproveitar entradas antigas
+VERSAO_CACHE = 3
+
+def _configuracao_cache(motor: str = 'dsatur', pos_processamento: Optional[str] = None,
+                        alocador: str = 'emparelhamento', por_componentes: bool = False, gerar_imagens: bool = True,
+                        imagens_em_segundo_plano: bool = False, formato_imagem: str = 'png',
+                        dpi_imagem: int = DPI_IMAGEM, **_) -> Dict:
+    # Configurações do solver que entram na chave do cache (as demais opções são ignoradas)
+    return {'motor': motor, 'pos_processamento': pos_processamento, 'alocador': alocador,
+            'por_componentes': por_componentes,
+            'imagens': [formato_imagem, dpi_imagem] if gerar_imagens and not imagens_em_segundo_plano else False}
+
+def chaveCache(caminho_csv: str, configuracao: Dict) -> str:
+    """Chave do cache: hash SHA-256 do conteúdo do CSV, das configurações do solver e da versão."""
+    h = hashlib.sha256()
+    with open(caminho_csv, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 16), b''):
+            h.update(bloco)
+    h.update(json.dumps({'versao': VERSAO_CACHE, **configuracao}, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+def lerCache(chave: str, diretorio: str = DIRETORIO_CACHE) -> Optional[Dict]:
+    """
+    Procura um resultado no cache e restaura os arquivos gerados por ele.
+
+    Arquivos que já estão iguais aos do cache não são copiados. A entrada é marcada como
+    usada agora, para a remoção por LRU.
+
+    Returns:
+        Dicionário salvo por gravarCache, ou None se a chave não estiver no cache
+    """
+    entrada = os.path.join(diretorio, chave)
+    caminho_resultado = os.path.join(entrada, "resultado.json")
+    if not os.path.exists(caminho_resultado):
+        return None
+
+    with open(caminho_resultado, encoding='utf-8') as f:
+        resultado = json.load(f)
+
+    for arquivo in resultado['arquivos']:
+        origem = os.path.join(entrada, "arquivos", arquivo)
+        if os.path.exists(arquivo) and filecmp.cmp(origem, arquivo, shallow=False):
+            continue
+        if os.path.dirname(arquivo):
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+        shutil.copyfile(origem, arquivo)
+    _remover_horarios_orfaos(resultado['arquivos'])
+
+    os.utime(caminho_resultado)
+    return resultado
+
+def gravarCache(chave: str, resultado: Dict, arquivos: List[str], diretorio: str = DIRETORIO_CACHE,
+                tamanho_maximo: int = TAMANHO_MAXIMO_CACHE):
+    """
+    Grava um resultado e cópias dos arquivos gerados no cache, removendo as entradas usadas
+    há mais tempo enquanto o cache passar de tamanho_maximo bytes.
+
+    Args:
+        chave: Chave calculada por chaveCache
+        resultado: Dicionário serializável em JSON (coloração, grade de horários etc.)
+        arquivos: Caminhos relativos dos arquivos gerados pela execução
+        diretorio: Diretório do cache
+        tamanho_maximo: Tamanho máximo do cache em bytes
+    """
+    entrada = os.path.join(diretorio, chave)
+    temporario = entrada + ".tmp"
+    shutil.rmtree(temporario, ignore_errors=True)
+
+    for arquivo in arquivos:
+        destino = os.path.join(temporario, "arquivos", arquivo)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        shutil.copyfile(arquivo, destino)
+    with open(os.path.join(temporario, "resultado.json"), 'w', encoding='utf-8') as f:
+        json.dump({**resultado, 'arquivos': arquivos}, f, ensure_ascii=False)
+
+    # A entrada só aparece completa, mesmo se a execução for interrompida
+    shutil.rmtree(entrada, ignore_errors=True)
+    os.replace(temporario, entrada)
+
+    _reduzir_cache(diretorio, tamanho_maximo)
+
+def _reduzir_cache(diretorio: str, tamanho_maximo: int):
+    # Entradas de resultado e arquivos de layout disputam o mesmo limite. Um processo que
+    # desenha os grafos em segundo plano pode estar reduzindo o cache ao mesmo tempo, então
+    # arquivos que somem no meio da contagem são ignorados
+    entradas = []
+    for nome in os.listdir(diretorio):
+        caminho_resultado = os.path.join(diretorio, nome, "resultado.json")
+        # Entradas ainda sendo gravadas (.tmp) e o diretório de layouts ficam de fora
+        if nome.endswith(".tmp") or not os.path.exists(caminho_resultado):
+            continue
+        try:
+            tamanho = sum(os.path.getsize(os.path.join(raiz, arquivo))
+                          for raiz, _, arquivos in os.walk(os.path.join(diretorio, nome))
+                          for arquivo in arquivos)
+            entradas.append((os.path.getmtime(caminho_resultado), os.path.join(diretorio, nome), tamanho))
+        except OSError:
+            continue
+
+    layouts = os.path.join(diretorio, os.path.basename(DIRETORIO_LAYOUTS))
+    if os.path.isdir(layouts):
+        for nome in os.listdir(layouts):
+            if not nome.endswith(".json"):
+                continue
+            caminho = os.path.join(layouts, nome)
+            try:
+                entradas.append((os.path.getmtime(caminho), caminho, os.path.getsize(caminho)))
+            except OSError:
+                continue
+
+    # Menos recentemente usadas primeiro
+    total = sum(tamanho for _, _, tamanho in entradas)
+    for _, caminho, tamanho in sorted(entradas):
+        if total <= tamanho_maximo:
+            break
+        if os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+        else:
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+        total -= tamanho
+
+def removerEntradaCache(chave: Optional[str] = None, diretorio: str = DIRETORIO_CACHE):
+    """Remove uma entrada do cache, ou o cache inteiro se chave for None."""
+    caminho = diretorio if chave is None else os.path.join(diretorio, chave)
+    shutil.rmtree(caminho, ignore_errors=True)
+
+def chaveLayout(grafo: "nx.Graph", algoritmo: str, parametros: Dict) -> str:
+    """Chave do layout: hash SHA-256 dos nós e arestas do grafo (sem atributos), do algoritmo e dos parâmetros."""
+    h = hashlib.sha256()
+    h.update(json.dumps({'algoritmo': algoritmo, **parametros}, sort_keys=True).encode('utf-8'))
+    for no in sorted(map(str, grafo.nodes())):
+        h.update(no.encode('utf-8') + b'\0')
+    h.update(b'\1')
+    for u, v in sorted(tuple(sorted((str(u), str(v)))) for u, v in grafo.edges()):
+        h.update(u.encode('utf-8') + b'\0' + v.encode('utf-8') + b'\0')
+    return h.hexdigest()
+
+def layoutEmCache(grafo: "nx.Graph", algoritmo: str, parametros: Dict, diretorio: Optional[str] = None) -> Dict:
+    """
+    Calcula as posições dos nós com o layout algoritmo do networkx, reaproveitando as de uma
+    execução anterior se a estrutura do grafo for a mesma.
+
+    Só nós e arestas entram na chave (chaveLayout), então um grafo com as mesmas restrições e
+    outra coloração reaproveita o layout, e o desenho fica estável entre execuções.
+
+    O diretório de layouts fica dentro de um diretório de cache, e cada layout conta como uma
+    entrada do LRU desse cache: um layout lido é marcado como usado agora, e gravar um layout
+    novo remove as entradas usadas há mais tempo se o cache passar de TAMANHO_MAXIMO_CACHE.
+
+    Args:
+        grafo: Grafo a desenhar (nós identificados por strings)
+        algoritmo: Nome da função de layout do networkx ('spring_layout', 'kamada_kawai_layout')
+        parametros: Argumentos da função de layout
+        diretorio: Diretório do cache de layouts (padrão: DIRETORIO_LAYOUTS)
+
+    Returns:
+        Dicionário nó -> (x, y)
+    """
+    if diretorio is None:
+        diretorio = DIRETORIO_LAYOUTS
+    caminho = os.path.join(diretorio, chaveLayout(grafo, algoritmo, parametros) + ".json")
+
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            posicoes = json.load(f)
+        os.utime(caminho)
+        return {no: tuple(posicoes[str(no)]) for no in grafo.nodes()}
+
+    import networkx as nx
+    posicoes = getattr(nx, algoritmo)(grafo, **parametros)
+
+    os.makedirs(diretorio, exist_ok=True)
+    with open(caminho + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({str(no): [float(x), float(y)] for no, (x, y) in posicoes.items()}, f)
+    os.replace(caminho + ".tmp", caminho)
+    _reduzir_cache(os.path.dirname(os.path.abspath(diretorio)), TAMANHO_MAXIMO_CACHE)
+    return posicoes
+
+def processo_agendamento_principal(caminho_csv: str = None, motor: str = 'dsatur',
+                                   pos_processamento: Optional[str] = None, alocador: str = 'emparelhamento',
+                                   por_componentes: bool = False, trabalhadores: Optional[int] = None,
+                                   usar_cache: bool = True, invalidar_cache: bool = False,
+                                   perfil: Optional[PerfilExecucao] = None, gerar_imagens: bool = True,
+                                   imagens_em_segundo_plano: bool = False, formato_imagem: str = 'png',
+                                   dpi_imagem: int = DPI_IMAGEM):
+    """
+    Carrega o CSV, colore o grafo e tenta dividir os horários até 250 vezes, exportando o
+    primeiro agendamento válido.
+
+    Com gerar_imagens=False (modo headless) só os CSVs, o estado e o snapshot são gerados.
+    Com imagens_em_segundo_plano=True o agendamento é retornado assim que for válido e os
+    grafos são desenhados em outro processo (ver aguardar_renderizacoes), no formato
+    formato_imagem ('png' ou 'svg') e com resolução dpi_imagem.
+
+    Com um PerfilExecucao ativo em perfil, cada etapa (cache, carregamento, lista de
+    adjacência, coloração, pós-processamento, alocação, validação, imagens, exportação) é
+    medida e os contadores nos, arestas, cores e tentativas são registrados.
+
+    Returns:
+        Tupla (horarios, nos) ou (None, None)
+    """
+    if perfil is None:
+        perfil = PerfilExecucao(ativo=False)
+    if caminho_csv is None:
+        caminho_csv = os.path.join("..", "datasets", "csv", "semestre1.csv")
+
+    chave = None
+    if usar_cache:
+        with perfil.etapa('cache'):
+            chave = chaveCache(caminho_csv, _configuracao_cache(motor, pos_processamento, alocador, por_componentes,
+                                                               gerar_imagens, imagens_em_segundo_plano,
+                                                               formato_imagem, dpi_imagem))
+            if invalidar_cache:
+                removerEntradaCache(chave)
+                resultado = None
+            else:
+                resultado = lerCache(chave)
+        perfil.definir('cache_acerto', resultado is not None)
+        if resultado is not None:
+            # O snapshot restaurado do cache já traz os nós com cor e horário
+            with SnapshotAgendamento(ARQUIVO_SNAPSHOT) as snapshot:
+                nos = snapshot.disciplinas()
+                # Entradas de execuções com imagens em segundo plano não guardam as imagens
+                if gerar_imagens and imagens_em_segundo_plano:
+                    renderizar_grafos_em_segundo_plano(nos, snapshot.lista_adjacencia(), formato_imagem, dpi_imagem)
+            return resultado['horarios'], nos
+
+    with perfil.etapa('carregamento'):
+        if caminho_csv.endswith('.npz'):
+            # Snapshot: nós e adjacência já prontos, sem reler o CSV
+            with SnapshotAgendamento(caminho_csv) as snapshot:
+                nos = snapshot.disciplinas()
+                arestas = snapshot.lista_adjacencia()
+            tabela = TabelaDisciplinas(nos)
+        else:
+            tabela = carregarTabelaDisciplinas(caminho_csv)
+            nos = tabela.nos
+    if not caminho_csv.endswith('.npz'):
+        with perfil.etapa('lista_adjacencia'):
+            arestas = criarListaAdjacencia(nos, tabela)
+    perfil.definir('nos', len(nos))
+    perfil.definir('arestas', sum(len(vizinhos) for vizinhos in arestas.values()) // 2)
+
+    # A coloração é feita uma vez; cada tentativa parte dela, já que a divisão de horários altera as cores
+    with perfil.etapa('coloracao'):
+        if por_componentes:
+            cores = colorirPorComponentes(nos, arestas, motor, trabalhadores)
+        else:
+            cores = MOTORES_COLORACAO[motor](nos, arestas)
+    if pos_processamento is not None:
+        cores_construcao = cores
+        with perfil.etapa('pos_processamento'):
+            cores = POS_PROCESSAMENTOS[pos_processamento](nos, arestas, limite_inferior=limiteInferiorClique(nos, arestas, tabela))
+        print(f"Pós-processamento {pos_processamento}: {cores_construcao} -> {cores} cores")
+    perfil.definir('cores', cores)
+    cores_iniciais = [no.cor for no in nos]
     
     tentativas_maximas = 250
 
     for tentativa in range(tentativas_maximas):
-        cores = colorirGrafoDSatur(nos, arestas)
-        horarios = fazerDivisaoHorario(nos, arestas)
+        perfil.contar('tentativas')
+        for no, cor in zip(nos, cores_iniciais):
+            no.cor = cor
+        with perfil.etapa('alocacao_horarios'):
+            horarios = ALOCADORES_HORARIO[alocador](nos, arestas, semente=42 + tentativa, tabela=tabela)
 
         if horarios is None:
             logging.error(f"Falha no agendamento na tentativa {tentativa}")
+            if alocador in ALOCADORES_EXATOS:
+                # O emparelhamento acha uma alocação sempre que ela existe, e a semente só muda
+                # o dia escolhido: com as mesmas cores, as outras tentativas falhariam também
+                mensagem = (f"As {cores} cores não cabem nos horários da semana; é preciso recolorir "
+                            "com menos cores (--motor exato ou --pos-processamento tabu)")
+                logging.critical(mensagem)
+                print(mensagem)
+                return None, None
             continue
 
-        if (verificar_restricoes_professor(horarios, nos) and
-                verificar_restricoes_turma(horarios, nos) and
-                verificar_restricoes_curso(horarios, nos)):
-            
-            # Criar e salvar o grafo de disciplinas e professores
-            grafo_disciplina_curso = criar_grafo_disciplina_curso(nos)
-            salvar_grafo_como_imagem(grafo_disciplina_curso)
-            
-            # Criar e salvar o grafo de restrições
-            grafo_restricoes = criar_grafo_coloracao_restricoes(nos, arestas)
-            salvar_grafo_restricoes_como_imagem(grafo_restricoes)
-
-            # Exportar horários
-            exportar_horarios(horarios, nos)
-
+        with perfil.etapa('validacao'):
+            violacoes = validar_agendamento(horarios, nos, tabela)
+        perfil.contar('violacoes', len(violacoes))
+        if _registrar_violacoes(violacoes):
+            arquivos = _finalizar_agendamento(horarios, nos, arestas, perfil, gerar_imagens,
+                                              imagens_em_segundo_plano, formato_imagem, dpi_imagem)
+            if chave is not None:
+                gravarCache(chave, {'horarios': horarios}, arquivos)
             return horarios, nos
 
     logging.critical("Não foi possível encontrar um agendamento válido após tentativas máximas")
     return None, None
 
+def executar_tentativa(nos: List[Disciplina], arestas: Dict, estrategia: str, semente: int,
+                       pos_processamento: Optional[str] = None, limite_inferior: int = 0,
+                       limite_tempo: Optional[float] = None, alocador: str = 'emparelhamento',
+                       tabela: Optional[TabelaDisciplinas] = None) -> Dict:
+    """
+    Executa uma tentativa completa de agendamento: coloração, divisão de horários e validação.
+
+    Args:
+        nos: Lista de objetos Disciplina (as cores e horários dos nós são sobrescritos)
+        arestas: Dicionário de adjacência do grafo de conflitos
+        estrategia: Estratégia de coloração (ver ESTRATEGIAS_COLORACAO)
+        semente: Semente usada na coloração aleatória e no embaralhamento dos horários
+        pos_processamento: Etapa de POS_PROCESSAMENTOS aplicada à coloração (ou None)
+        limite_inferior: Limite inferior de cores repassado ao pós-processamento
+        limite_tempo: Tempo máximo em segundos do pós-processamento
+        alocador: Alocador de horários de ALOCADORES_HORARIO
+        tabela: TabelaDisciplinas de nos, se já tiver sido montada
+
+    Returns:
+        Dicionário com 'valido', 'estrategia', 'semente', 'cores', 'cores_construcao',
+        'horarios_usados', 'horarios', 'atribuicoes' (cor e horário de cada nó) e 'violacoes'
+    """
+    if tabela is None:
+        tabela = TabelaDisciplinas(nos)
+
+    cores = cores_construcao = colorirComEstrategia(nos, arestas, estrategia, semente)
+    if pos_processamento is not None and cores > limite_inferior:
+        cores = POS_PROCESSAMENTOS[pos_processamento](nos, arestas, limite_inferior=limite_inferior,
+                                                      semente=semente, limite_tempo=limite_tempo)
+    horarios = ALOCADORES_HORARIO[alocador](nos, arestas, semente=semente, tabela=tabela)
+
+    resultado = {
+        'valido': False,
+        'estrategia': estrategia,
+        'semente': semente,
+        'cores': cores,
+        'cores_construcao': cores_construcao,
+        'horarios_usados': None,
+        'horarios': horarios,
+        'atribuicoes': [(no.cor, no.horario) for no in nos],
+        'violacoes': [],
+    }
+
+    if horarios is None:
+        return resultado
+
+    resultado['horarios_usados'] = sum(cor is not None for dia in horarios for cor in dia.values())
+    resultado['violacoes'] = [violacao.mensagem for violacao in validar_agendamento(horarios, nos, tabela)]
+    resultado['valido'] = not resultado['violacoes']
+    return resultado
+
+def aplicar_tentativa(resultado: Dict, nos: List[Disciplina]):
+    """Copia as cores e horários de uma tentativa para os nós."""
+    for no, (cor, horario) in zip(nos, resultado['atribuicoes']):
+        no.cor = cor
+        no.horario = horario
+
+# Estado de cada processo do portfólio, definido uma única vez por _inicializar_trabalhador
+_estado_trabalhador = {}
+
+def _inicializar_trabalhador(nos: List[Disciplina], arestas: Dict, pos_processamento: Optional[str] = None,
+                             limite_inferior: int = 0, alocador: str = 'emparelhamento'):
+    _estado_trabalhador['nos'] = nos
+    _estado_trabalhador['tabela'] = TabelaDisciplinas(nos)
+    _estado_trabalhador['arestas'] = arestas
+    _estado_trabalhador['pos_processamento'] = pos_processamento
+    _estado_trabalhador['limite_inferior'] = limite_inferior
+    _estado_trabalhador['alocador'] = alocador
+
+def _executar_tentativa_trabalhador(estrategia: str, semente: int, prazo: Optional[float] = None) -> Dict:
+    # prazo é um instante de time.time(), comparável entre processos; o tempo restante limita o pós-processamento
+    limite_tempo = None if prazo is None else max(0.0, prazo - time.time())
+    return executar_tentativa(_estado_trabalhador['nos'], _estado_trabalhador['arestas'], estrategia, semente,
+                              _estado_trabalhador['pos_processamento'], _estado_trabalhador['limite_inferior'],
+                              limite_tempo=limite_tempo, alocador=_estado_trabalhador['alocador'],
+                              tabela=_estado_trabalhador['tabela'])
+
+def processo_agendamento_portfolio(caminho_csv: str = None, trabalhadores: Optional[int] = None,
+                                   tempo_limite: Optional[float] = None, tentativas_maximas: int = 250,
+                                   criterio: str = 'primeiro', pos_processamento: Optional[str] = None,
+                                   alocador: str = 'emparelhamento', gerar_imagens: bool = True,
+                                   imagens_em_segundo_plano: bool = False, formato_imagem: str = 'png',
+                                   dpi_imagem: int = DPI_IMAGEM):
+    """
+    Distribui tentativas independentes de agendamento entre vários processos.
+
+    Cada tentativa usa uma semente própria e alterna entre as estratégias de
+    ESTRATEGIAS_COLORACAO. Com criterio='primeiro' o primeiro agendamento válido
+    encerra a busca; com criterio='melhor' todas as tentativas (ou as que couberem no
+    tempo limite) são avaliadas e vence a que usa menos cores e, depois, menos horários.
+    A busca 'melhor' também para quando o número de cores atinge o limite inferior.
+
+    Args:
+        caminho_csv: Caminho do CSV de disciplinas (padrão: semestre1.csv)
+        trabalhadores: Quantidade de processos (padrão: número de CPUs)
+        tempo_limite: Tempo máximo em segundos para a busca (padrão: sem limite); o tempo que
+            resta é repassado a cada tentativa como limite do pós-processamento
+        tentativas_maximas: Quantidade máxima de tentativas
+        criterio: 'primeiro' ou 'melhor'
+        pos_processamento: Etapa de POS_PROCESSAMENTOS aplicada em cada tentativa (ou None)
+        alocador: Alocador de horários de ALOCADORES_HORARIO
+        gerar_imagens: Se False, não desenha os grafos (modo headless)
+        imagens_em_segundo_plano, formato_imagem, dpi_imagem: Ver processo_agendamento_principal
+
+    Returns:
+        Tupla (horarios, nos) do agendamento escolhido ou (None, None)
+    """
+    if criterio not in ('primeiro', 'melhor'):
+        raise ValueError(f"Critério desconhecido: {criterio}")
+
+    if caminho_csv is None:
+        caminho_csv = os.path.join("..", "datasets", "csv", "semestre1.csv")
+    tabela = carregarTabelaDisciplinas(caminho_csv)
+    nos = tabela.nos
+    arestas = criarListaAdjacencia(nos, tabela)
+
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+    prazo = None if tempo_limite is None else time.monotonic() + tempo_limite
+    prazo_trabalhadores = None if tempo_limite is None else time.time() + tempo_limite
+    limite_inferior = limiteInferiorClique(nos, arestas, tabela)
+    melhor = None
+
+    executor = ProcessPoolExecutor(max_workers=trabalhadores, initializer=_inicializar_trabalhador,
+                                   initargs=(nos, arestas, pos_processamento, limite_inferior, alocador))
+    try:
+        proxima_tentativa = 0
+        pendentes = set()
+
+        def submeter():
+            nonlocal proxima_tentativa
+            # Mantém só algumas tentativas na fila, para poder parar cedo
+            while proxima_tentativa < tentativas_maximas and len(pendentes) < 2 * trabalhadores:
+                estrategia = ESTRATEGIAS_COLORACAO[proxima_tentativa % len(ESTRATEGIAS_COLORACAO)]
+                pendentes.add(executor.submit(_executar_tentativa_trabalhador, estrategia, 42 + proxima_tentativa,
+                                              prazo_trabalhadores))
+                proxima_tentativa += 1
+
+        submeter()
+        while pendentes:
+            restante = None if prazo is None else max(0.0, prazo - time.monotonic())
+            concluidas, pendentes = wait(pendentes, timeout=restante, return_when=FIRST_COMPLETED)
+            if not concluidas:
+                logging.error("Tempo limite do portfólio atingido")
+                break
+
+            for futuro in concluidas:
+                resultado = futuro.result()
+                if not resultado['valido']:
+                    logging.error(f"Falha no agendamento na tentativa {resultado['estrategia']}/{resultado['semente']}")
+                    continue
+                if melhor is None or (resultado['cores'], resultado['horarios_usados']) < (melhor['cores'], melhor['horarios_usados']):
+                    melhor = resultado
+
+            # Com o limite inferior atingido nenhuma tentativa pode ser melhor
+            if melhor is not None and (criterio == 'primeiro' or melhor['cores'] <= limite_inferior):
+                break
+            submeter()
+    finally:
+        # Tentativas na fila são canceladas; as que já estão rodando terminam dentro do prazo
+        # (o pós-processamento recebe o tempo restante), e a função só retorna depois delas
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    if melhor is None:
+        logging.critical("Não foi possível encontrar um agendamento válido após tentativas máximas")
+        return None, None
+
+    aplicar_tentativa(melhor, nos)
+    print(f"Cores usadas: {melhor['cores']} (construção: {melhor['cores_construcao']}, "
+          f"limite inferior: {limite_inferior}, lacuna: {melhor['cores'] - limite_inferior})")
+    _finalizar_agendamento(melhor['horarios'], nos, arestas, gerar_imagens=gerar_imagens,
+                           imagens_em_segundo_plano=imagens_em_segundo_plano, formato_imagem=formato_imagem,
+                           dpi_imagem=dpi_imagem)
+    return melhor['horarios'], nos
+
+def processo_agendamento_com_prazo(caminho_csv: str = None, prazo: float = 10.0, exportar: bool = True,
+                                   pos_processamento: Optional[str] = None,
+                                   alocador: str = 'emparelhamento', gerar_imagens: bool = True,
+                                   imagens_em_segundo_plano: bool = False, formato_imagem: str = 'png',
+                                   dpi_imagem: int = DPI_IMAGEM) -> ResultadoAgendamento:
+    """
+    Busca agendamentos até o prazo e retorna o melhor agendamento válido encontrado.
+
+    As tentativas alternam entre as estratégias de ESTRATEGIAS_COLORACAO com sementes
+    diferentes, e o melhor resultado (menos cores e, depois, menos horários usados) é
+    mantido. O prazo é verificado entre tentativas, que levam poucos milissegundos, então
+    a latência fica próxima do valor pedido. A exportação acontece depois do prazo.
+
+    A busca também para assim que o melhor agendamento usa tantas cores quanto o limite
+    inferior dado pela clique de limiteInferiorClique, pois ele já é ótimo.
+
+    Args:
+        caminho_csv: Caminho do CSV de disciplinas (padrão: semestre1.csv)
+        prazo: Tempo de busca em segundos
+        exportar: Se True, salva as imagens e os CSVs do melhor agendamento
+        pos_processamento: Etapa de POS_PROCESSAMENTOS aplicada em cada tentativa (ou None)
+        alocador: Alocador de horários de ALOCADORES_HORARIO
+        gerar_imagens: Se False, a exportação não desenha os grafos (modo headless)
+        imagens_em_segundo_plano, formato_imagem, dpi_imagem: Ver processo_agendamento_principal
+
+    Returns:
+        ResultadoAgendamento com o melhor agendamento e os metadados da busca
+    """
+    inicio = time.monotonic()
+
+    if caminho_csv is None:
+        caminho_csv = os.path.join("..", "datasets", "csv", "semestre1.csv")
+    tabela = carregarTabelaDisciplinas(caminho_csv)
+    nos = tabela.nos
+    arestas = criarListaAdjacencia(nos, tabela)
+
+    resultado = ResultadoAgendamento(nos=nos)
+    resultado.pos_processamento = pos_processamento
+    resultado.limite_inferior = limiteInferiorClique(nos, arestas, tabela)
+    melhor = None
+
+    while resultado.tentativas == 0 or time.monotonic() - inicio < prazo:
+        # Nenhuma tentativa pode usar menos cores que o limite inferior
+        if melhor is not None and melhor['cores'] <= resultado.limite_inferior:
+            break
+
+        estrategia = ESTRATEGIAS_COLORACAO[resultado.tentativas % len(ESTRATEGIAS_COLORACAO)]
+        restante = max(0.0, prazo - (time.monotonic() - inicio))
+        tentativa = executar_tentativa(nos, arestas, estrategia, 42 + resultado.tentativas, pos_processamento,
+                                       resultado.limite_inferior, limite_tempo=restante, alocador=alocador,
+                                       tabela=tabela)
+        resultado.tentativas += 1
+
+        if not tentativa['valido']:
+            continue
+
+        if resultado.tempo_primeira_solucao is None:
+            resultado.tempo_primeira_solucao = time.monotonic() - inicio
+        if melhor is None or (tentativa['cores'], tentativa['horarios_usados']) < (melhor['cores'], melhor['horarios_usados']):
+            melhor = tentativa
+
+    resultado.tempo_total = time.monotonic() - inicio
+
+    if melhor is None:
+        logging.critical(f"Nenhum agendamento válido encontrado em {prazo} segundos")
+        return resultado
+
+    aplicar_tentativa(melhor, nos)
+    resultado.horarios = melhor['horarios']
+    resultado.cores = melhor['cores']
+    resultado.cores_construcao = melhor['cores_construcao']
+    resultado.horarios_usados = melhor['horarios_usados']
+    resultado.estrategia = melhor['estrategia']
+    resultado.semente = melhor['semente']
+
+    if exportar:
+        _finalizar_agendamento(resultado.horarios, nos, arestas, gerar_imagens=gerar_imagens,
+                               imagens_em_segundo_plano=imagens_em_segundo_plano, formato_imagem=formato_imagem,
+                               dpi_imagem=dpi_imagem)
+
+    return resultado
+
+ARQUIVO_ESTADO = "estado_agendamento.json"
+ARQUIVO_SNAPSHOT = "agendamento.npz"
+ARQUIVO_PERFIL = "perfil_execucao.json"
+
+def chavesDisciplinas(nos: List[Disciplina]) -> List[str]:
+    """
+    Chave estável de cada nó entre execuções: curso, PPC, período, código e a parte da
+    disciplina (disciplinas de 4 e 5 horas viram dois nós).
+    """
+    partes = defaultdict(int)
+    chaves = []
+    for no in nos:
+        base = f"{no.curso}|{no.ppc}|{no.periodo}|{no.codigo}"
+        chaves.append(f"{base}|{partes[base]}")
+        partes[base] += 1
+    return chaves
+
+def salvarEstadoAgendamento(nos: List[Disciplina], arestas: Dict, horarios: List[Dict],
+                            caminho: str = ARQUIVO_ESTADO):
+    """Salva nós, arestas, cores e horários para o modo incremental."""
+    chaves = chavesDisciplinas(nos)
+    estado = {
+        'nos': [{
+            'chave': chave,
+            'nome': no.nome,
+            'ch': no.ch,
+            'professores': no.professores,
+            'cor': no.cor,
+            'horario': no.horario,
+        } for chave, no in zip(chaves, nos)],
+        'arestas': [sorted(arestas[i]) for i in range(len(nos))],
+        'horarios': horarios,
+    }
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(estado, f, ensure_ascii=False)
+
+def atualizarListaAdjacencia(nos: List[Disciplina], tabela: TabelaDisciplinas, arestas_anteriores: Dict,
+                             indice_anterior: Dict[int, int], afetados: set) -> Dict[int, set]:
+    """
+    Atualiza a lista de adjacência da execução anterior em vez de reconstruí-la.
+
+    Nós não afetados reaproveitam as arestas antigas entre si (remapeadas para os novos
+    índices). Só as linhas dos nós afetados são recalculadas pelos índices invertidos da
+    tabela, e as arestas correspondentes são espelhadas nos vizinhos.
+
+    Args:
+        nos: Nós da nova execução
+        tabela: TabelaDisciplinas dos novos nós
+        arestas_anteriores: Lista de adjacência anterior (índices antigos)
+        indice_anterior: Novo índice -> índice antigo, para nós não afetados
+        afetados: Novos índices de nós novos ou alterados
+
+    Returns:
+        Lista de adjacência dos novos nós
+    """
+    novo_indice = {antigo: novo for novo, antigo in indice_anterior.items()}
+    listaAdjacencia = {}
+    for i in range(len(nos)):
+        if i in afetados:
+            listaAdjacencia[i] = set()
+        else:
+            listaAdjacencia[i] = {novo_indice[j] for j in arestas_anteriores[indice_anterior[i]]
+                                  if j in novo_indice and novo_indice[j] not in afetados}
+
+    for i in afetados:
+        vizinhos = set(tabela.nos_por_turma[tabela.turma[i]])
+        mascara = tabela.mascara_professores[i]
+        while mascara:
+            bit = mascara & -mascara
+            vizinhos.update(tabela.nos_por_professor[bit.bit_length() - 1])
+            mascara ^= bit
+        vizinhos.discard(i)
+        listaAdjacencia[i] = vizinhos
+        for j in vizinhos:
+            listaAdjacencia[j].add(i)
+
+    return listaAdjacencia
+
+def _trocar_cadeia_kempe(nos: List[Disciplina], listaAdjacencia: Dict, inicio: List[int], a: int, b: int) -> set:
+    # Cadeia de Kempe: nós alcançáveis a partir de inicio usando só as cores a e b
+    cadeia = set(inicio)
+    fila = deque(inicio)
+    while fila:
+        i = fila.popleft()
+        for j in listaAdjacencia[i]:
+            if j not in cadeia and nos[j].cor in (a, b):
+                cadeia.add(j)
+                fila.append(j)
+    return cadeia
+
+def recolorirVizinhanca(nos: List[Disciplina], listaAdjacencia: Dict, afetados: set,
+                        cores_anteriores: Optional[Dict[int, int]] = None) -> set:
+    """
+    Recolore só os nós afetados, mantendo as cores dos demais.
+
+    Um nó afetado que já existia (nome, professores ou carga horária alterados) fica com
+    a cor anterior se ela continuar livre na vizinhança e compatível com a máscara de
+    turnos da classe; esses nós são tratados primeiro. Os demais recebem a menor cor
+    existente livre e compatível. Se não houver, tenta uma troca por cadeia de Kempe: para
+    um par de cores (a, b) de mesma máscara, a cadeia a/b que contém os vizinhos de cor a
+    é invertida se não alcançar nenhum vizinho de cor b, liberando a cor a. Só em último
+    caso uma cor nova é criada.
+
+    Args:
+        nos: Lista de objetos Disciplina (nós afetados com cor None)
+        listaAdjacencia: Lista de adjacência atualizada
+        afetados: Índices dos nós a recolorir
+        cores_anteriores: Índice -> cor da execução anterior, para nós afetados que já existiam
+
+    Returns:
+        Índices de todos os nós cuja cor mudou (afetados e nós trocados por Kempe)
+    """
+    cores_anteriores = cores_anteriores or {}
+    mascaras = mascarasTurnos(nos)
+    mascara_cor = {}
+    for i, no in enumerate(nos):
+        if i not in afetados and no.cor is not None:
+            mascara_cor[no.cor] = mascara_cor.get(no.cor, MASCARA_TODOS_TURNOS) & mascaras[i]
+
+    alterados = set()
+    # Nós com cor anterior primeiro; depois os com mais vizinhos já coloridos, como no DSatur
+    for v in sorted(afetados, key=lambda i: (i not in cores_anteriores,
+                                             -sum(nos[j].cor is not None for j in listaAdjacencia[i]), i)):
+        cores_vizinhas = {nos[j].cor for j in listaAdjacencia[v] if nos[j].cor is not None}
+        compativeis = sorted(c for c, m in mascara_cor.items() if m & mascaras[v])
+
+        anterior = cores_anteriores.get(v)
+        if anterior is not None and anterior not in cores_vizinhas and \
+                mascara_cor.get(anterior, MASCARA_TODOS_TURNOS) & mascaras[v]:
+            nos[v].cor = anterior
+            mascara_cor[anterior] = mascara_cor.get(anterior, MASCARA_TODOS_TURNOS) & mascaras[v]
+            continue
+
+        alterados.add(v)
+        cor = next((c for c in compativeis if c not in cores_vizinhas), None)
+
+        if cor is None:
+            # Reparo por cadeia de Kempe
+            for a in compativeis:
+                vizinhos_a = [j for j in listaAdjacencia[v] if nos[j].cor == a]
+                for b in compativeis:
+                    if b == a or mascara_cor[b] != mascara_cor[a]:
+                        continue
+                    cadeia = _trocar_cadeia_kempe(nos, listaAdjacencia, vizinhos_a, a, b)
+                    if any(nos[j].cor == b for j in listaAdjacencia[v] if j in cadeia):
+                        continue
+                    for j in cadeia:
+                        nos[j].cor = b if nos[j].cor == a else a
+                    alterados |= cadeia
+                    cor = a
+                    break
+                if cor is not None:
+                    break
+
+        if cor is None:
+            cor = max(mascara_cor, default=-1) + 1
+            mascara_cor[cor] = MASCARA_TODOS_TURNOS
+
+        nos[v].cor = cor
+        mascara_cor[cor] &= mascaras[v]
+
+    return alterados
+
+def processo_agendamento_incremental(caminho_csv: str = None, caminho_estado: str = ARQUIVO_ESTADO,
+                                     opcoes_completo: Optional[Dict] = None):
+    """
+    Reagenda só o que mudou no CSV desde a última execução salva.
+
+    O CSV novo é comparado com o estado salvo por chavesDisciplinas. Nós novos ou com
+    professores, carga horária ou nome alterados são os afetados: só as linhas deles na
+    lista de adjacência são recalculadas, só eles (e eventuais cadeias de Kempe) são
+    recoloridos, nós alterados mantêm a cor anterior sempre que ela continua válida, e
+    cada cor tenta manter o horário da execução anterior. Apenas os CSVs
+    de turma e de professor cujo conteúdo mudou são regravados (os de turmas e professores
+    que ficaram sem disciplinas são removidos), e as imagens dos grafos não são geradas.
+    O estado e o snapshot são regravados, para que export e render partam do agendamento
+    novo, e o resultado entra no cache com a chave do CSV novo (como uma execução sem
+    imagens ou com imagens em segundo plano). Sem estado salvo, ou se o reparo não gerar
+    um agendamento válido, o processo completo é executado.
+
+    Args:
+        caminho_csv: Caminho do CSV de disciplinas (padrão: semestre1.csv)
+        caminho_estado: Arquivo de estado salvo pela execução anterior
+        opcoes_completo: Argumentos de processo_agendamento_principal usados quando o
+            processo completo é executado
+
+    Returns:
+        Tupla (horarios, nos) ou (None, None)
+    """
+    if caminho_csv is None:
+        caminho_csv = os.path.join("..", "datasets", "csv", "semestre1.csv")
+    opcoes_completo = opcoes_completo or {}
+    if not os.path.exists(caminho_estado):
+        return processo_agendamento_principal(caminho_csv, **opcoes_completo)
+
+    with open(caminho_estado, encoding='utf-8') as f:
+        estado = json.load(f)
+    anteriores = {no['chave']: (i, no) for i, no in enumerate(estado['nos'])}
+
+    tabela = carregarTabelaDisciplinas(caminho_csv)
+    nos = tabela.nos
+
+    # Diferença entre o CSV novo e o estado salvo
+    indice_anterior = {}
+    afetados = set()
+    cores_anteriores = {}
+    for i, (chave, no) in enumerate(zip(chavesDisciplinas(nos), nos)):
+        anterior = anteriores.get(chave)
+        if anterior is None or (anterior[1]['professores'], anterior[1]['ch'], anterior[1]['nome']) != \
+                (no.professores, no.ch, no.nome):
+            afetados.add(i)
+            if anterior is not None:
+                cores_anteriores[i] = anterior[1]['cor']
+        else:
+            indice_anterior[i] = anterior[0]
+            no.cor = anterior[1]['cor']
+
+    arestas = atualizarListaAdjacencia(nos, tabela, dict(enumerate(estado['arestas'])), indice_anterior, afetados)
+    alterados = recolorirVizinhanca(nos, arestas, afetados, cores_anteriores)
+
+    alocacao_anterior = {cor: (dia, turno) for dia, turnos in enumerate(estado['horarios'])
+                         for turno, cor in turnos.items() if cor is not None}
+    horarios = alocarHorariosEmparelhamento(nos, arestas, tabela=tabela, alocacao_anterior=alocacao_anterior)
+
+    if horarios is None or not _registrar_violacoes(validar_agendamento(horarios, nos, tabela)):
+        logging.error("Reparo incremental falhou; executando o agendamento completo")
+        return processo_agendamento_principal(caminho_csv, **opcoes_completo)
+
+    gravados = exportar_horarios(horarios, nos)
+    _salvar_estado_e_snapshot(horarios, nos, arestas, caminho_estado, tabela)
+    # As entradas do cache guardam caminhos relativos ao diretório de saída
+    if opcoes_completo.get('usar_cache', True) and caminho_estado == ARQUIVO_ESTADO:
+        configuracao = _configuracao_cache(**{**opcoes_completo, 'gerar_imagens': False})
+        gravarCache(chaveCache(caminho_csv, configuracao), {'horarios': horarios},
+                    [caminho_estado, ARQUIVO_SNAPSHOT] + list(gravados))
+    print(f"Incremental: {len(afetados)} nós afetados, {len(alterados)} recoloridos, "
+          f"{sum(gravados.values())} arquivos regravados")
+    return horarios, nos
+
 def logicalXOR(a, b, condition):
     # return (a and not b) or (not a and b)
     return ((a == condition and b != condition) or (a != condition and b == condition))
 
-def carregarDisciplinasCsv(caminhoCsv: str) -> list[Disciplina]:
-    # Obtém o caminho absoluto do arquivo CSV
-    caminho_absoluto = os.path.abspath(caminhoCsv)
-
-    # Lê os dados do CSV
-    with open(caminho_absoluto, encoding="utf-8") as arquivo:
-        df = csv.reader(arquivo)
-        # Lê o cabeçalho para obter a quantidade de colunas
-        cabecalho = next(df)
-        TOTAL_COLUNAS_CABECALHO = len(cabecalho)
-
-        nos = []
-        indice = 0
-        for linha in df:
+def _numero_professor(valor: str) -> int:
+    # Aceita "7" ou o rótulo do cabeçalho largo, "Prof 7"
+    return int(valor.strip().rsplit(' ', 1)[-1])
+
+def lerLinhasDisciplinas(caminhoCsv: str) -> Iterator[tuple]:
+    """
+    Lê o CSV de disciplinas linha a linha e gera uma tupla por disciplina.
+
+    Aceita dois formatos, identificados pelo cabeçalho:
+    - largo: Curso, PPC, Período, Código da Disciplina, Nome da Disciplina, CH e uma coluna
+      0/1 por professor (Prof 1 .. Prof N);
+    - longo: as mesmas seis colunas e uma coluna Professor, com uma linha por par
+      (disciplina, professor). As linhas são agrupadas pelas seis primeiras colunas, em
+      qualquer ordem, e as disciplinas saem na ordem da primeira linha de cada uma; uma
+      disciplina sem professor tem a coluna Professor vazia.
+
+    No formato largo só as células '1' são visitadas (list.index percorre a linha em C),
+    então o custo por linha acompanha a quantidade de professores da disciplina. As
+    strings repetidas (curso, PPC, período) são internadas. No formato longo as disciplinas
+    só são geradas depois da última linha, já que qualquer linha pode completar uma delas.
+
+    Args:
+        caminhoCsv: Caminho do arquivo CSV
+
+    Returns:
+        Gerador de tuplas (curso, ppc, periodo, codigo, nome, ch, professores)
+    """
+    with open(os.path.abspath(caminhoCsv), encoding="utf-8", newline='') as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = next(leitor)
+
+        if len(cabecalho) == 7 and cabecalho[6].strip() == 'Professor':
+            # Disciplina (seis primeiras colunas) -> professores; o dict preserva a ordem de inserção
+            disciplinas = {}
+            for linha in leitor:
+                chave = tuple(linha[:6])
+                professores = disciplinas.get(chave)
+                if professores is None:
+                    professores = disciplinas[chave] = []
+                if linha[6].strip():
+                    professor = _numero_professor(linha[6])
+                    if professor not in professores:
+                        professores.append(professor)
+            for (curso, ppc, periodo, codigo, nome, ch), professores in disciplinas.items():
+                yield (sys.intern(curso), sys.intern(ppc), sys.intern(periodo), codigo, nome, int(ch), professores)
+            return
+
+        for linha in leitor:
             professores = []
-            for i in range(6, TOTAL_COLUNAS_CABECALHO, 1): # a partir do 6 tem o Prof 1
-                if linha[i] == '1': # significa que o professor ministra a disciplina
+            i = 5 # a partir do 6 tem o Prof 1
+            try:
+                while True:
+                    i = linha.index('1', i + 1) # significa que o professor ministra a disciplina
                     professores.append(i - 5)
-        
-            curso = linha[0]
-            ppc = linha[1]
-            periodo = linha[2]
-            codigo = linha[3]
-            nome_disciplina = linha[4]
-            ch = int(linha[5])
+            except ValueError:
+                pass
 
-            
-            if ch == 5:
-                nos.append(Disciplina(indice, curso, ppc, periodo, codigo, nome_disciplina, 3, professores))
-                nos.append(Disciplina(indice + 1, curso, ppc, periodo, codigo, nome_disciplina, 2, professores))
-                indice += 2
-            elif ch == 4:
-                nos.append(Disciplina(indice, curso, ppc, periodo, codigo, nome_disciplina, 2, professores))
-                nos.append(Disciplina(indice + 1, curso, ppc, periodo, codigo, nome_disciplina, 2, professores))
-                indice += 2
-            else:
-                nos.append(Disciplina(indice, curso, ppc, periodo, codigo, nome_disciplina, ch, professores))
-                indice += 1
+            yield (sys.intern(linha[0]), sys.intern(linha[1]), sys.intern(linha[2]),
+                   linha[3], linha[4], int(linha[5]), professores)
 
-        return nos
+def iterarDisciplinasCsv(caminhoCsv: str) -> Iterator[Disciplina]:
+    """
+    Gera os nós do grafo a partir do CSV, sem montar a lista inteira.
 
+    Disciplinas de 5 horas viram um nó de 3 e um de 2 horas, e as de 4 horas dois nós de
+    2 horas; os dois nós compartilham a lista de professores.
+    """
+    indice = 0
+    for curso, ppc, periodo, codigo, nome_disciplina, ch, professores in lerLinhasDisciplinas(caminhoCsv):
+        if ch == 5:
+            partes = (3, 2)
+        elif ch == 4:
+            partes = (2, 2)
+        else:
+            partes = (ch,)
+        for parte in partes:
+            yield Disciplina(indice, curso, ppc, periodo, codigo, nome_disciplina, parte, professores)
+            indice += 1
 
-def criarListaAdjacencia(nos: list[Disciplina]) -> dict[int, set[int]]:
-    listaAdjacencia = {}
+def carregarDisciplinasCsv(caminhoCsv: str) -> list[Disciplina]:
+    return list(iterarDisciplinasCsv(caminhoCsv))
 
-    for i in range(len(nos)):
+def carregarTabelaDisciplinas(caminhoCsv: str) -> TabelaDisciplinas:
+    """Lê o CSV e monta a TabelaDisciplinas (nós e índices invertidos) em uma única passada."""
+    return TabelaDisciplinas(iterarDisciplinasCsv(caminhoCsv))
 
-        arestas = set()
 
-        for j in range(len(nos)):
+def criarListaAdjacencia(nos: list[Disciplina], tabela: Optional[TabelaDisciplinas] = None) -> dict[int, set[int]]:
+    """
+    Gera a lista de adjacência do grafo de conflitos a partir de índices invertidos.
 
-            if i == j:
-                continue
+    Em vez de comparar todos os pares de nós, as disciplinas são agrupadas por turma e
+    por professor, e as arestas só são criadas dentro de cada grupo, então o custo
+    acompanha o número de arestas e não n². Os grupos vêm dos índices invertidos da
+    TabelaDisciplinas.
 
-            # nao há porque permitir que nos com cargas horarias diferentes se conectem, ja que vao ser colocados em blocos diferentes de qualquer forma
-            # if nos[i].ch != nos[j].ch:
-            #     continue
+    A separação entre SIN (noite) e os demais cursos (dia) não vira arestas: ela é uma
+    restrição implícita, dada pela máscara de turnos permitidos de cada nó
+    (mascaraTurnosPermitidos) e respeitada pelos algoritmos de coloração e de alocação.
 
-            # se um dos cursos for sistemas e o outro nao for, nao precisa fazer as conexoes, ja que um é a noite e o outro nao
-            if logicalXOR(nos[i].curso, nos[j].curso, 'SIN'):
-                arestas.add(j)
-            if nos[i].turma == nos[j].turma:
-                arestas.add(j)
+    Args:
+        nos: Lista de objetos Disciplina
+        tabela: TabelaDisciplinas de nos, se já tiver sido montada
+
+    Returns:
+        Dicionário que associa o índice de cada nó ao conjunto de índices vizinhos
+    """
+    if tabela is None:
+        tabela = TabelaDisciplinas(nos)
+    listaAdjacencia = {i: set() for i in range(len(nos))}
 
-            for p in nos[i].professores:
-                if p in nos[j].professores:
-                    arestas.add(j)
+    # Disciplinas da mesma turma ou do mesmo professor formam uma clique
+    for grupo in tabela.nos_por_turma + tabela.nos_por_professor:
+        membros = set(grupo)
+        for i in grupo:
+            listaAdjacencia[i] |= membros
 
-        listaAdjacencia[i] = arestas
+    for i, arestas in listaAdjacencia.items():
+        arestas.discard(i)
 
     return listaAdjacencia
 
 def colorirGrafoDSatur(nos: list, listaAdjacencia: dict) -> int:
+    """
+    Colore o grafo com o algoritmo DSatur usando saturação incremental.
+
+    Cada nó guarda o conjunto de cores dos seus vizinhos, e uma fila de prioridade
+    (heap) ordenada por (saturação, grau, índice) escolhe o próximo nó. Ao colorir um
+    nó, só os vizinhos ainda não coloridos são atualizados; entradas antigas do heap
+    são descartadas quando retiradas. Os empates são resolvidos como na versão
+    original: maior grau e, depois, menor índice. Uma cor só é reaproveitada se a
+    máscara de turnos da sua classe for compatível com a do nó.
+
+    Args:
+        nos: Lista de objetos Disciplina
+        listaAdjacencia: Dicionário de adjacência do grafo de conflitos
+
+    Returns:
+        Quantidade de cores usadas
+    """
     # Inicialização
     cores_usadas = set()
-    grau_saturacao = [0] * len(nos)
     cores_nos = [None] * len(nos)
-    nao_coloridos = set(range(len(nos)))
-
-    while nao_coloridos:
-        # Seleciona o nó com maior grau de saturação
-        # Em caso de empate, escolhe o de maior grau (número de vizinhos)
-        max_saturacao = -1
-        candidatos = []
-        for i in nao_coloridos:
-            sat = len(set(cores_nos[vizinho] for vizinho in listaAdjacencia[i] if cores_nos[vizinho] is not None))
-            if sat > max_saturacao:
-                max_saturacao = sat
-                candidatos = [i]
-            elif sat == max_saturacao:
-                candidatos.append(i)
-        # Seleciona o nó com maior grau entre os candidatos
-        grau_max = -1
-        for i in candidatos:
-            grau = len(listaAdjacencia[i])
-            if grau > grau_max:
-                grau_max = grau
-                no_escolhido = i
+    cores_vizinhas = [set() for _ in range(len(nos))]
+    graus = [len(listaAdjacencia[i]) for i in range(len(nos))]
+    mascaras = mascarasTurnos(nos)
+    mascara_cor = []  # turnos em comum entre os nós de cada cor
+
+    fila = [(0, -graus[i], i) for i in range(len(nos))]
+    heapq.heapify(fila)
+
+    while fila:
+        # Retira o nó com maior saturação e, em caso de empate, maior grau
+        saturacao_negativa, _, no_escolhido = heapq.heappop(fila)
+        if cores_nos[no_escolhido] is not None or -saturacao_negativa != len(cores_vizinhas[no_escolhido]):
+            continue  # entrada desatualizada
+
         # Atribui a menor cor possível
-        cores_vizinhos = set(cores_nos[vizinho] for vizinho in listaAdjacencia[no_escolhido] if cores_nos[vizinho] is not None)
+        cores_vizinhos = cores_vizinhas[no_escolhido]
+        mascara = mascaras[no_escolhido]
         cor = 0
-        while cor in cores_vizinhos:
+        while cor in cores_vizinhos or (cor < len(mascara_cor) and not mascara_cor[cor] & mascara):
             cor += 1
+        if cor == len(mascara_cor):
+            mascara_cor.append(mascara)
+        else:
+            mascara_cor[cor] &= mascara
         cores_nos[no_escolhido] = cor
         cores_usadas.add(cor)
-        nao_coloridos.remove(no_escolhido)
-        # Atualiza o grau de saturação dos vizinhos
+
+        # Atualiza o grau de saturação só dos vizinhos ainda não coloridos
         for vizinho in listaAdjacencia[no_escolhido]:
-            if cores_nos[vizinho] is None:
-                grau_saturacao[vizinho] += 1
+            if cores_nos[vizinho] is None and cor not in cores_vizinhas[vizinho]:
+                cores_vizinhas[vizinho].add(cor)
+                heapq.heappush(fila, (-len(cores_vizinhas[vizinho]), -graus[vizinho], vizinho))
+
     # Atribui as cores aos nós
     for i in range(len(nos)):
         nos[i].cor = cores_nos[i]
     return len(cores_usadas)
 
-def colorirGrafo(nos: list, listaAdjacencia: dict) -> int:
+def colorirGrafo(nos: list, listaAdjacencia: dict, ordem: list[int] = None) -> int:
     # Número de cores usadas até agora
     cores = 0
 
+    # Sem ordem definida, os nós são coloridos na ordem em que foram carregados
+    if ordem is None:
+        ordem = range(len(nos))
+
+    # Limpa cores de execuções anteriores para não bloquear cores por engano
+    for no in nos:
+        no.cor = None
+
+    # Turnos em comum entre os nós de cada cor
+    mascaras = mascarasTurnos(nos)
+    mascara_cor = []
+
     # Para cada nó, vamos tentar colori-lo
-    for i in range(len(nos)):
+    for i in ordem:
 
         # Lista de cores que não podem ser usadas
         coresBloqueadas = []
@@ -534,24 +1613,508 @@ def colorirGrafo(nos: list, listaAdjacencia: dict) -> int:
         # Inicializa corFinal como -1 para buscar uma cor disponível
         corFinal = -1
 
-        # Procura uma cor que não esteja na lista de cores bloqueadas
+        # Procura uma cor que não esteja na lista de cores bloqueadas e tenha turno compatível
         for cor in range(cores):
 
-            if cor not in coresBloqueadas:
+            if cor not in coresBloqueadas and mascara_cor[cor] & mascaras[i]:
 
                 corFinal = cor
+                mascara_cor[cor] &= mascaras[i]
                 break
 
         # Se nenhuma cor disponível foi encontrada, cria uma nova cor
         if corFinal == -1:
             corFinal = cores
             cores += 1
+            mascara_cor.append(mascaras[i])
         
         # Atribui a cor ao nó
         nos[i].cor = corFinal
 
     return cores
 
+def ordemMaiorGrau(listaAdjacencia: dict) -> list[int]:
+    """Ordena os nós do maior para o menor grau (Welsh-Powell)."""
+    return sorted(listaAdjacencia, key=lambda i: -len(listaAdjacencia[i]))
+
+def ordemMenorUltimo(listaAdjacencia: dict) -> list[int]:
+    """
+    Ordem smallest-last: remove repetidamente o nó de menor grau restante e
+    colore na ordem inversa da remoção.
+    """
+    graus = {i: len(vizinhos) for i, vizinhos in listaAdjacencia.items()}
+    fila = [(grau, i) for i, grau in graus.items()]
+    heapq.heapify(fila)
+    removidos = set()
+    ordem = []
+
+    while fila:
+        grau, i = heapq.heappop(fila)
+        if i in removidos or grau != graus[i]:
+            continue  # entrada desatualizada
+        removidos.add(i)
+        ordem.append(i)
+        for vizinho in listaAdjacencia[i]:
+            if vizinho not in removidos:
+                graus[vizinho] -= 1
+                heapq.heappush(fila, (graus[vizinho], vizinho))
+
+    ordem.reverse()
+    return ordem
+
+def colorirComEstrategia(nos: list, listaAdjacencia: dict, estrategia: str, semente: int = 42) -> int:
+    """
+    Colore o grafo usando uma das estratégias de ordenação de ESTRATEGIAS_COLORACAO.
+
+    Args:
+        nos: Lista de objetos Disciplina
+        listaAdjacencia: Dicionário de adjacência do grafo de conflitos
+        estrategia: 'dsatur', 'maior_grau', 'menor_ultimo', 'aleatoria' ou 'exato'
+        semente: Semente usada pela estratégia 'aleatoria'
+
+    Returns:
+        Quantidade de cores usadas
+    """
+    if estrategia == 'dsatur':
+        return colorirGrafoDSatur(nos, listaAdjacencia)
+    if estrategia == 'maior_grau':
+        return colorirGrafo(nos, listaAdjacencia, ordemMaiorGrau(listaAdjacencia))
+    if estrategia == 'menor_ultimo':
+        return colorirGrafo(nos, listaAdjacencia, ordemMenorUltimo(listaAdjacencia))
+    if estrategia == 'exato':
+        return colorirGrafoExato(nos, listaAdjacencia)
+    if estrategia == 'aleatoria':
+        ordem = list(range(len(nos)))
+        random.Random(semente).shuffle(ordem)
+        return colorirGrafo(nos, listaAdjacencia, ordem)
+    raise ValueError(f"Estratégia de coloração desconhecida: {estrategia}")
+
+ESTRATEGIAS_COLORACAO = ['dsatur', 'maior_grau', 'menor_ultimo', 'aleatoria']
+
+def encontrarCliqueMaximal(nos: list[Disciplina], listaAdjacencia: dict,
+                           tabela: Optional[TabelaDisciplinas] = None) -> list[int]:
+    """
+    Encontra de forma gulosa uma clique maximal grande no grafo de conflitos.
+
+    As disciplinas de uma mesma turma e as de um mesmo professor já formam cliques.
+    Cada um desses grupos é usado como semente e estendido com o vizinho comum de maior
+    grau até não haver mais candidatos. Como disciplinas noturnas (SIN) e diurnas nunca
+    dividem uma cor, a busca é feita em cada janela de turnos e as duas melhores
+    cliques são unidas: juntas elas exigem cores distintas.
+
+    Args:
+        nos: Lista de objetos Disciplina
+        listaAdjacencia: Dicionário de adjacência do grafo de conflitos
+        tabela: TabelaDisciplinas de nos, se já tiver sido montada
+
+    Returns:
+        Lista com os índices dos nós da clique
+    """
+    if tabela is None:
+        tabela = TabelaDisciplinas(nos)
+
+    clique_total = []
+    for noturno in (False, True):
+        janela = {i for i in range(len(nos)) if tabela.noturno[i] == noturno}
+
+        melhor_clique = []
+        for semente in tabela.nos_por_turma + tabela.nos_por_professor:
+            grupo = janela.intersection(semente)
+            if not grupo:
+                continue
+            clique = sorted(grupo)
+
+            candidatos = set(janela)
+            for i in clique:
+                candidatos &= listaAdjacencia[i]
+
+            # Estende a clique com o candidato de maior grau enquanto houver vizinhos comuns
+            while candidatos:
+                escolhido = max(candidatos, key=lambda j: (len(listaAdjacencia[j]), -j))
+                clique.append(escolhido)
+                candidatos &= listaAdjacencia[escolhido]
+
+            if len(clique) > len(melhor_clique):
+                melhor_clique = clique
+
+        clique_total.extend(melhor_clique)
+
+    return clique_total
+
+def limiteInferiorClique(nos: list[Disciplina], listaAdjacencia: dict,
+                         tabela: Optional[TabelaDisciplinas] = None) -> int:
+    """Limite inferior para o número de cores: o tamanho de uma clique maximal."""
+    return len(encontrarCliqueMaximal(nos, listaAdjacencia, tabela))
+
+def colorirGrafoExato(nos: list, listaAdjacencia: dict, limite_nos: int = 200000,
+                      limite_tempo: Optional[float] = 10.0) -> int:
+    """
+    Coloração exata por branch-and-bound guiado pela ordem do DSatur.
+
+    A solução do DSatur é a incumbente inicial e a clique de encontrarCliqueMaximal é
+    pré-colorida e serve de limite inferior. Os domínios de cada nó são inteiros usados
+    como bitsets (bit c ligado = cor c usada por algum vizinho), e cada cor guarda a
+    máscara de turnos em comum dos seus nós. A busca só tenta cores
+    menores que a melhor solução conhecida menos um e para ao provar a otimalidade, ou
+    quando atinge o limite de nós ou de tempo; nesse caso a melhor incumbente é usada.
+
+    Args:
+        nos: Lista de objetos Disciplina
+        listaAdjacencia: Dicionário de adjacência do grafo de conflitos
+        limite_nos: Quantidade máxima de atribuições exploradas
+        limite_tempo: Tempo máximo da busca em segundos (None para sem limite)
+
+    Returns:
+        Quantidade de cores usadas
+    """
+    n = len(nos)
+    inicio = time.monotonic()
+
+    # Incumbente inicial e limite inferior
+    melhor_k = colorirGrafoDSatur(nos, listaAdjacencia)
+    melhor_cores = [no.cor for no in nos]
+    clique = encontrarCliqueMaximal(nos, listaAdjacencia)
+    limite_inferior = len(clique)
+    if melhor_k <= limite_inferior:
+        return melhor_k
+
+    vizinhos = [list(listaAdjacencia[i]) for i in range(n)]
+    graus = [len(v) for v in vizinhos]
+    mascaras = mascarasTurnos(nos)
+    cores = [-1] * n
+    proibidas = [0] * n
+    mascara_cor = [MASCARA_TODOS_TURNOS] * (n + 1)
+
+    # A clique recebe as cores 0..|clique|-1, o que elimina permutações simétricas
+    for cor, i in enumerate(clique):
+        cores[i] = cor
+        mascara_cor[cor] = mascaras[i]
+        for j in vizinhos[i]:
+            proibidas[j] |= 1 << cor
+    k = len(clique)
+    nao_coloridos = set(range(n)) - set(clique)
+
+    def abrir_ramo():
+        # Escolhe o nó de maior saturação (empate: maior grau, menor índice)
+        v = max(nao_coloridos, key=lambda i: (proibidas[i].bit_count(), graus[i], -i))
+        limite = min(k + 1, melhor_k - 1)
+        candidatas = [c for c in range(limite) if not proibidas[v] >> c & 1 and mascara_cor[c] & mascaras[v]]
+        return [v, candidatas, 0, None, k, None]
+
+    pilha = [abrir_ramo()] if nao_coloridos else []
+    explorados = 0
+    while pilha:
+        explorados += 1
+        if explorados > limite_nos or (limite_tempo is not None and explorados % 1024 == 0
+                                       and time.monotonic() - inicio > limite_tempo):
+            logging.info(f"Coloração exata interrompida após {explorados} nós; usando a melhor incumbente")
+            break
+
+        ramo = pilha[-1]
+        v, candidatas, posicao, desfazer, k_anterior, mascara_anterior = ramo
+
+        # Desfaz a atribuição anterior deste ramo
+        if desfazer is not None:
+            for j, proibidas_anteriores in desfazer:
+                proibidas[j] = proibidas_anteriores
+            mascara_cor[cores[v]] = mascara_anterior
+            cores[v] = -1
+            nao_coloridos.add(v)
+            k = k_anterior
+            ramo[3] = None
+
+        # As candidatas são crescentes; se uma não melhora a incumbente, nenhuma melhora
+        if posicao >= len(candidatas) or candidatas[posicao] >= melhor_k - 1:
+            pilha.pop()
+            continue
+
+        cor = candidatas[posicao]
+        ramo[2] = posicao + 1
+
+        cores[v] = cor
+        ramo[5] = mascara_cor[cor]
+        mascara_cor[cor] &= mascaras[v]
+        nao_coloridos.discard(v)
+        bit = 1 << cor
+        desfazer = []
+        for j in vizinhos[v]:
+            if cores[j] == -1 and not proibidas[j] & bit:
+                desfazer.append((j, proibidas[j]))
+                proibidas[j] |= bit
+        ramo[3] = desfazer
+        k = max(k, cor + 1)
+
+        if not nao_coloridos:
+            melhor_k = k
+            melhor_cores = cores[:]
+            if melhor_k <= limite_inferior:
+                break
+            continue
+
+        novo_ramo = abrir_ramo()
+        if novo_ramo[1]:
+            pilha.append(novo_ramo)
+
+    for i in range(n):
+        nos[i].cor = melhor_cores[i]
+    return melhor_k
+
+def reduzirCoresTabu(nos: list, listaAdjacencia: dict, max_iteracoes: int = 10000, limite_inferior: int = 0,
+                     semente: int = 42, limite_tempo: Optional[float] = None) -> int:
+    """
+    Pós-processamento TabuCol: tenta remover uma cor de cada vez de uma coloração existente.
+
+    A classe de cor com menos nós é eliminada e seus nós vão para a cor com menos
+    conflitos. Em seguida a busca tabu move nós em conflito para outras cores até zerar
+    os conflitos. Uma matriz de conflitos (vizinhos de cada nó em cada cor) é mantida de
+    forma incremental, então cada movimento é avaliado em O(1). Os nós só se movem para
+    cores com turnos compatíveis com a sua máscara. Quando a busca não zera os conflitos
+    dentro do limite de iterações, a última coloração válida é mantida.
+
+    Args:
+        nos: Lista de objetos Disciplina já coloridos
+        listaAdjacencia: Dicionário de adjacência do grafo de conflitos
+        max_iteracoes: Iterações da busca tabu para cada cor removida
+        limite_inferior: Para ao atingir essa quantidade de cores
+        semente: Semente do gerador aleatório usado nos desempates
+        limite_tempo: Tempo máximo em segundos (None para sem limite)
+
+    Returns:
+        Quantidade de cores usadas
+    """
+    n = len(nos)
+    inicio = time.monotonic()
+    gerador = random.Random(semente)
+
+    # Renumera as cores para 0..k-1
+    renumeracao = {}
+    cores = [renumeracao.setdefault(no.cor, len(renumeracao)) for no in nos]
+    k = len(renumeracao)
+    melhor_cores = cores[:]
+    vizinhos = [list(listaAdjacencia[i]) for i in range(n)]
+
+    # Cada classe mantém os turnos em comum da coloração inicial; um nó só vai para
+    # uma cor cuja máscara seja compatível com a sua
+    mascaras = mascarasTurnos(nos)
+    mascara_classe = [MASCARA_TODOS_TURNOS] * k
+    for i in range(n):
+        mascara_classe[cores[i]] &= mascaras[i]
+
+    while k - 1 >= max(limite_inferior, 1):
+        if limite_tempo is not None and time.monotonic() - inicio > limite_tempo:
+            break
+
+        # Remove a menor classe cujos nós tenham outra cor compatível, trocando-a pela última cor
+        tamanhos = [0] * k
+        for cor in cores:
+            tamanhos[cor] += 1
+        removiveis = [c for c in range(k)
+                      if any(mascara_classe[outra] & mascara_classe[c] for outra in range(k) if outra != c)]
+        if not removiveis:
+            break
+        removida = min(removiveis, key=lambda c: tamanhos[c])
+        k -= 1
+        orfaos = [i for i in range(n) if cores[i] == removida]
+        for i in orfaos:
+            cores[i] = -1
+        for i in range(n):
+            if cores[i] == k:
+                cores[i] = removida
+        mascara_classe_anterior = mascara_classe
+        mascara_classe = mascara_classe[:k]
+        if removida != k:
+            mascara_classe[removida] = mascara_classe_anterior[k]
+        permitidas = [[c for c in range(k) if mascara_classe[c] & mascaras[i]] for i in range(n)]
+
+        # Matriz de conflitos: conflitos[v][c] = vizinhos de v com a cor c
+        conflitos = [[0] * k for _ in range(n)]
+        for i in range(n):
+            if cores[i] >= 0:
+                for j in vizinhos[i]:
+                    conflitos[j][cores[i]] += 1
+        for i in orfaos:
+            cor = min(permitidas[i], key=lambda c: (conflitos[i][c], gerador.random()))
+            cores[i] = cor
+            for j in vizinhos[i]:
+                conflitos[j][cor] += 1
+
+        total = sum(conflitos[i][cores[i]] for i in range(n)) // 2
+        melhor_total = total
+        tabu = [[0] * k for _ in range(n)]
+        conflitantes = {i for i in range(n) if conflitos[i][cores[i]] > 0}
+
+        iteracao = 0
+        while total > 0 and iteracao < max_iteracoes:
+            iteracao += 1
+            if limite_tempo is not None and iteracao % 256 == 0 and time.monotonic() - inicio > limite_tempo:
+                break
+
+            # Avalia todos os movimentos (nó em conflito, nova cor) em O(1) cada
+            melhor_delta = None
+            movimentos = []
+            for v in conflitantes:
+                atual = conflitos[v][cores[v]]
+                for c in permitidas[v]:
+                    if c == cores[v]:
+                        continue
+                    delta = conflitos[v][c] - atual
+                    if tabu[v][c] > iteracao and total + delta >= melhor_total:
+                        continue  # movimento tabu sem critério de aspiração
+                    if melhor_delta is None or delta < melhor_delta:
+                        melhor_delta = delta
+                        movimentos = [(v, c)]
+                    elif delta == melhor_delta:
+                        movimentos.append((v, c))
+
+            if not movimentos:
+                continue
+
+            v, nova = movimentos[gerador.randrange(len(movimentos))]
+            antiga = cores[v]
+            cores[v] = nova
+            total += melhor_delta
+            for j in vizinhos[v]:
+                conflitos[j][antiga] -= 1
+                conflitos[j][nova] += 1
+                if conflitos[j][cores[j]] > 0:
+                    conflitantes.add(j)
+                else:
+                    conflitantes.discard(j)
+            if conflitos[v][nova] > 0:
+                conflitantes.add(v)
+            else:
+                conflitantes.discard(v)
+
+            tabu[v][antiga] = iteracao + int(0.6 * len(conflitantes)) + gerador.randrange(10)
+            melhor_total = min(melhor_total, total)
+
+        if total > 0:
+            break
+        melhor_cores = cores[:]
+
+    for i in range(n):
+        nos[i].cor = melhor_cores[i]
+    return len(set(melhor_cores))
+
+MOTORES_COLORACAO = {
+    'dsatur': colorirGrafoDSatur,
+    'greedy': colorirGrafo,
+    'exato': colorirGrafoExato,
+}
+
+# Etapas de pós-processamento aplicadas sobre uma coloração já construída
+POS_PROCESSAMENTOS = {
+    'tabu': reduzirCoresTabu,
+}
+
+def encontrarComponentes(listaAdjacencia: dict) -> list[list[int]]:
+    """Separa o grafo em componentes conexas (busca em largura), cada uma com seus índices em ordem."""
+    visitados = set()
+    componentes = []
+    for inicio in listaAdjacencia:
+        if inicio in visitados:
+            continue
+        visitados.add(inicio)
+        componente = [inicio]
+        fila = deque([inicio])
+        while fila:
+            i = fila.popleft()
+            for j in listaAdjacencia[i]:
+                if j not in visitados:
+                    visitados.add(j)
+                    componente.append(j)
+                    fila.append(j)
+        componentes.append(sorted(componente))
+    return componentes
+
+def _colorir_componentes(motor: str, lote: list) -> list[list[int]]:
+    # Executado nos processos do pool: colore cada subgrafo do lote com o motor escolhido
+    cores = []
+    for sub_nos, sub_adjacencia in lote:
+        MOTORES_COLORACAO[motor](sub_nos, sub_adjacencia)
+        cores.append([no.cor for no in sub_nos])
+    return cores
+
+def colorirPorComponentes(nos: list, listaAdjacencia: dict, motor: str = 'dsatur',
+                          trabalhadores: Optional[int] = None) -> int:
+    """
+    Colore cada componente conexa separadamente, em paralelo, e junta as colorações.
+
+    Sem as arestas de turno, turmas só se ligam por professores em comum, então o grafo
+    se divide em várias componentes independentes. Elas são distribuídas em lotes de
+    tamanho parecido por um pool de processos. Na junção, classes de componentes
+    diferentes podem dividir uma cor global, pois não há arestas entre elas; basta que as
+    máscaras de turnos tenham algum turno em comum. Cada classe vai para uma cor global
+    de mesma máscara, depois para uma menos restrita e só então para uma nova cor.
+
+    Args:
+        nos: Lista de objetos Disciplina
+        listaAdjacencia: Dicionário de adjacência do grafo de conflitos
+        motor: Motor de MOTORES_COLORACAO usado em cada componente
+        trabalhadores: Quantidade de processos (padrão: número de CPUs; 1 colore sem pool)
+
+    Returns:
+        Quantidade de cores globais usadas
+    """
+    componentes = encontrarComponentes(listaAdjacencia)
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+
+    subgrafos = []
+    for componente in componentes:
+        posicao = {i: p for p, i in enumerate(componente)}
+        sub_adjacencia = {posicao[i]: {posicao[j] for j in listaAdjacencia[i]} for i in componente}
+        subgrafos.append(([nos[i] for i in componente], sub_adjacencia))
+
+    # Lotes com quantidades parecidas de nós, começando pelas maiores componentes
+    quantidade_lotes = min(len(subgrafos), trabalhadores * 4) or 1
+    lotes = [[] for _ in range(quantidade_lotes)]
+    tamanhos = [0] * quantidade_lotes
+    ordem = sorted(range(len(subgrafos)), key=lambda c: -len(componentes[c]))
+    posicao_no_lote = {}
+    for c in ordem:
+        lote = tamanhos.index(min(tamanhos))
+        posicao_no_lote[c] = (lote, len(lotes[lote]))
+        lotes[lote].append(subgrafos[c])
+        tamanhos[lote] += len(componentes[c])
+
+    if trabalhadores == 1 or len(subgrafos) == 1:
+        cores_lotes = [_colorir_componentes(motor, lote) for lote in lotes]
+    else:
+        with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+            cores_lotes = list(executor.map(_colorir_componentes, [motor] * len(lotes), lotes))
+
+    # Junta as classes locais nas cores globais
+    mascaras = mascarasTurnos(nos)
+    mascara_global = []
+    for c, componente in enumerate(componentes):
+        lote, posicao = posicao_no_lote[c]
+        cores_locais = cores_lotes[lote][posicao]
+
+        mascara_local = {}
+        for i, cor in zip(componente, cores_locais):
+            mascara_local[cor] = mascara_local.get(cor, MASCARA_TODOS_TURNOS) & mascaras[i]
+
+        usadas = set()
+        cor_global = {}
+        # Classes mais restritas escolhem primeiro
+        for cor in sorted(mascara_local, key=lambda c: (bin(mascara_local[c]).count('1'), c)):
+            mascara = mascara_local[cor]
+            livres = [g for g in range(len(mascara_global)) if g not in usadas and mascara_global[g] & mascara]
+            iguais = [g for g in livres if mascara_global[g] == mascara]
+            sem_restringir = [g for g in livres if mascara_global[g] & mascara == mascara_global[g]]
+            escolhida = (iguais or sem_restringir or livres or [None])[0]
+            if escolhida is None:
+                escolhida = len(mascara_global)
+                mascara_global.append(mascara)
+            else:
+                mascara_global[escolhida] &= mascara
+            usadas.add(escolhida)
+            cor_global[cor] = escolhida
+
+        for i, cor in zip(componente, cores_locais):
+            nos[i].cor = cor_global[cor]
+
+    return len(mascara_global)
 
 def criarGrafoTurmas(nos: list) -> dict:
 
@@ -573,9 +2136,10 @@ def criarGrafoTurmas(nos: list) -> dict:
     return grafoTurmas 
 
 
-def fazerDivisaoHorario(nos: list[Disciplina], grafoColorido: dict):
-    # Define uma semente fixa para os números aleatórios
-    random.seed(42)
+def fazerDivisaoHorario(nos: list[Disciplina], grafoColorido: dict, semente: int = 42,
+                        tabela: Optional[TabelaDisciplinas] = None):
+    # Gerador com semente própria, para que cada tentativa embaralhe de um jeito diferente
+    gerador = random.Random(semente)
 
     # Primeiro passo: Criar os horarios, que são dicionários com os horarios de cada dia da semana
     horarios = [{}, {}, {}, {}, {}]
@@ -592,8 +2156,8 @@ def fazerDivisaoHorario(nos: list[Disciplina], grafoColorido: dict):
         else:
             ch2.append(no)
     # Vamos usar o metodo shuffle para aleatoriezar um pouco a sequencia de horarios, evitando 5 horarios seguidos da mesma disciplina
-    random.shuffle(ch3)
-    random.shuffle(ch2)
+    gerador.shuffle(ch3)
+    gerador.shuffle(ch2)
     
     # Terceiro passo: Se separar uma cor para cada horario, podemos simplesmente conectar as disciplinas a suas respectivas cores
     for i in range(len(ch3)):
@@ -629,7 +2193,7 @@ def fazerDivisaoHorario(nos: list[Disciplina], grafoColorido: dict):
                 ch3[i].cor += 1
 
                 # se a cor for maior que 20 (só há 20 horarios no turno semanal mais longo), então um erro ocorreu na hora de criar as disciplinas
-                if ch2[i].cor > 20:
+                if ch3[i].cor > 20:
                     print('Horario nao adicionado : ' + ch3[i].nome, ch3[i].curso, ch3[i].cor, ch3[i].turma, ch3[i].ch)
                     return None
 
@@ -722,7 +2286,7 @@ def fazerDivisaoHorario(nos: list[Disciplina], grafoColorido: dict):
 
             # se nao tiver achado um horario bom, tentamos outras cores até achar uma que não tenha
             if not sucesso:
-                ch3[i].cor += 1
+                ch2[i].cor += 1
 
                 # se a cor for maior que 20 (só há 20 horarios no turno semanal mais longo), então um erro ocorreu na hora de criar as disciplinas
                 if ch2[i].cor > 20:
@@ -731,6 +2295,154 @@ def fazerDivisaoHorario(nos: list[Disciplina], grafoColorido: dict):
                 
     return horarios
 
+# Turnos de cada dia, blocos de 3 horas e rótulo de uma aula de 2 horas dentro de um bloco de 3
+TURNOS = ['M123', 'M45', 'T12', 'T345', 'N12', 'N345']
+TURNOS_NOTURNOS = {'N12', 'N345'}
+TURNOS_3H = {'M123', 'T345', 'N345'}
+ROTULOS_2H_EM_BLOCO_3H = {'M123': 'M12', 'T345': 'T34', 'N345': 'N34'}
+
+# Máscaras de bits sobre TURNOS (bit i ligado = TURNOS[i] permitido)
+MASCARA_NOTURNA = sum(1 << i for i, turno in enumerate(TURNOS) if turno in TURNOS_NOTURNOS)
+MASCARA_DIURNA = sum(1 << i for i, turno in enumerate(TURNOS) if turno not in TURNOS_NOTURNOS)
+MASCARA_3H = sum(1 << i for i, turno in enumerate(TURNOS) if turno in TURNOS_3H)
+MASCARA_TODOS_TURNOS = (1 << len(TURNOS)) - 1
+
+def mascaraTurnosPermitidos(no: Disciplina) -> int:
+    """
+    Turnos em que a disciplina pode ser alocada: SIN só à noite, os demais cursos só de
+    dia, e aulas de 3 horas só em blocos de 3 horas.
+
+    Disciplinas só podem dividir uma cor se as máscaras de todas elas tiverem algum turno
+    em comum; é assim que a separação entre noite e dia é garantida sem arestas.
+    """
+    janela = MASCARA_NOTURNA if no.curso == 'SIN' else MASCARA_DIURNA
+    return janela & MASCARA_3H if no.ch == 3 else janela
+
+def mascarasTurnos(nos: list) -> list[int]:
+    return [mascaraTurnosPermitidos(no) for no in nos]
+
+def alocarHorariosEmparelhamento(nos: list[Disciplina], grafoColorido: dict, semente: int = 42,
+                                 tabela: Optional[TabelaDisciplinas] = None,
+                                 alocacao_anterior: Optional[dict] = None):
+    """
+    Aloca as classes de cor nos horários da semana por emparelhamento bipartido.
+
+    Cada classe de cor precisa de um horário (dia, turno) só seu. As arestas do grafo
+    bipartido classes x horários seguem as máscaras de mascaraTurnosPermitidos: classes
+    de SIN só à noite e dos demais cursos só de dia, e classes com alguma aula de 3 horas
+    só em blocos de 3 horas (M123, T345, N345). O emparelhamento máximo é obtido por caminhos
+    aumentantes (algoritmo de Kuhn, com busca em largura para que cada classe desloque o
+    mínimo de classes já alocadas), então um horário para todas as classes é encontrado
+    em uma única passada sempre que existir.
+
+    Args:
+        nos: Lista de objetos Disciplina já coloridos
+        grafoColorido: Dicionário de adjacência (mantido pela compatibilidade com fazerDivisaoHorario)
+        semente: Semente usada para espalhar as classes pelos dias da semana
+        tabela: TabelaDisciplinas de nos, se já tiver sido montada
+        alocacao_anterior: Dicionário cor -> (dia, turno) de uma execução anterior; cada
+            classe fica no mesmo horário sempre que possível
+
+    Returns:
+        Lista com um dicionário turno -> cor para cada dia, ou None se não houver alocação
+    """
+    if tabela is None:
+        tabela = TabelaDisciplinas(nos)
+    gerador = random.Random(semente)
+
+    classes = defaultdict(list)
+    for i, no in enumerate(nos):
+        classes[no.cor].append(i)
+
+    # Horários compatíveis com cada classe de cor: os turnos em comum entre as máscaras dos seus nós
+    mascaras = mascarasTurnos(nos)
+    dias = list(range(5))
+    compativeis = {}
+    for cor, membros in classes.items():
+        mascara = MASCARA_TODOS_TURNOS
+        for i in membros:
+            mascara &= mascaras[i]
+        if not mascara:
+            logging.error(f"Cor {cor} reúne disciplinas sem turno em comum")
+            return None
+
+        turnos = [t for b, t in enumerate(TURNOS) if mascara >> b & 1]
+        # Classes só de 2 horas preferem blocos de 2 horas, deixando os de 3 para quem precisa
+        turnos.sort(key=lambda t: t in TURNOS_3H)
+        gerador.shuffle(dias)
+        compativeis[cor] = [(dia, turno) for turno in turnos for dia in dias]
+
+        anterior = (alocacao_anterior or {}).get(cor)
+        if anterior in compativeis[cor]:
+            compativeis[cor].remove(anterior)
+            compativeis[cor].insert(0, anterior)
+
+    def aumentar(cor):
+        # Busca em largura pelo caminho aumentante mais curto: um horário livre é sempre
+        # preferido, e só se desloca o menor número possível de classes já alocadas
+        chegou_por = {}
+        fila = deque([cor])
+        visitadas = {cor}
+        while fila:
+            atual = fila.popleft()
+            for horario in compativeis[atual]:
+                if horario in chegou_por:
+                    continue
+                chegou_por[horario] = atual
+                ocupante = cor_do_horario.get(horario)
+                if ocupante is None:
+                    # Cada classe do caminho passa para o horário que a alcançou
+                    while True:
+                        classe = chegou_por[horario]
+                        liberado = horario_da_classe.get(classe)
+                        cor_do_horario[horario] = classe
+                        horario_da_classe[classe] = horario
+                        if classe == cor:
+                            return True
+                        horario = liberado
+                if ocupante not in visitadas:
+                    visitadas.add(ocupante)
+                    fila.append(ocupante)
+        return False
+
+    # Horários da execução anterior são ocupados primeiro; os caminhos aumentantes só os
+    # trocam se for preciso para acomodar outra classe
+    cor_do_horario = {}
+    horario_da_classe = {}
+    for cor, horario in (alocacao_anterior or {}).items():
+        if cor in compativeis and compativeis[cor][0] == horario and horario not in cor_do_horario:
+            cor_do_horario[horario] = cor
+            horario_da_classe[cor] = horario
+
+    # Classes mais restritas primeiro
+    for cor in sorted(compativeis, key=lambda c: (len(compativeis[c]), str(c))):
+        if cor in horario_da_classe:
+            continue
+        if not aumentar(cor):
+            logging.error(f"Nenhum horário compatível disponível para a cor {cor}")
+            return None
+
+    horarios = [{turno: None for turno in TURNOS} for _ in range(5)]
+    horario_da_cor = {}
+    for (dia, turno), cor in cor_do_horario.items():
+        horarios[dia][turno] = cor
+        horario_da_cor[cor] = turno
+
+    for no in nos:
+        turno = horario_da_cor[no.cor]
+        no.horario = ROTULOS_2H_EM_BLOCO_3H[turno] if no.ch != 3 and turno in TURNOS_3H else turno
+
+    return horarios
+
+ALOCADORES_HORARIO = {
+    'linear': fazerDivisaoHorario,
+    'emparelhamento': alocarHorariosEmparelhamento,
+}
+
+# Alocadores que encontram um horário para todas as cores sempre que ele existir; se falham,
+# repetir com outra semente não adianta
+ALOCADORES_EXATOS = {'emparelhamento'}
+
 def exibirHorariosPorTurma(horarios, nos):
     dias = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta"]
     turnos = ['M123', 'M45', 'T12', 'T345', 'N12', 'N345']
@@ -762,224 +2474,574 @@ def exibirHorariosPorTurma(horarios, nos):
 
 # Exibe os horários organizados por turma
 
-def gerar_planilha_horarios(diretorio_csv, diretorio_xlsx, modo='professor'):
+LINHAS_HORARIO_PLANILHA = [
+    "07:00 - 07:55", "07:55 - 08:50", "08:50 - 09:45",
+    "10:10 - 11:05", "11:05 - 12:00",
+    "13:30 - 14:25", "14:25 - 15:20", "15:45 - 16:40", "16:40 - 17:35", "17:35 - 18:30",
+    "19:00 - 19:50", "19:50 - 20:40", "21:00 - 21:50", "21:50 - 22:40", "22:40 - 23:30"
+]
+# Turno -> intervalo de linhas de LINHAS_HORARIO_PLANILHA
+LINHAS_TURNO_PLANILHA = {
+    "M123": (0, 3),
+    "M45": (3, 5),
+    "T12": (5, 7),
+    "T345": (7, 10),
+    "N12": (10, 12),
+    "N345": (12, 15),
+}
+
+ARQUIVO_MANIFESTO_PLANILHAS = "manifesto.json"
+# Incrementar quando o layout ou os estilos das planilhas mudarem, para refazer todas
+VERSAO_ESTILO_PLANILHA = 1
+
+# Estilos nomeados das planilhas, criados uma vez por processo por _estilos_planilha
+_estilos_planilha_processo: List["NamedStyle"] = []
+
+def _estilos_planilha() -> List["NamedStyle"]:
+    from openpyxl.styles import PatternFill, Font, Alignment, NamedStyle
+
+    # Estilos nomeados: ficam uma vez no workbook e as células só guardam a referência
+    if _estilos_planilha_processo:
+        return _estilos_planilha_processo
+    _estilos_planilha_processo.extend([
+        NamedStyle(name="cabecalho", fill=PatternFill(start_color="4b598b", end_color="4b598b", fill_type="solid"),
+                   font=Font(color="FFFFFF", bold=True), alignment=Alignment(horizontal="center", vertical="center")),
+        NamedStyle(name="subcabecalho", fill=PatternFill(start_color="333366", end_color="333366", fill_type="solid"),
+                   font=Font(color="FFFFFF", bold=True), alignment=Alignment(horizontal="center", vertical="center")),
+        NamedStyle(name="linha", fill=PatternFill(start_color="f9fbfd", end_color="f9fbfd", fill_type="solid"),
+                   font=Font(color="000000"), alignment=Alignment(horizontal="center", vertical="center")),
+        NamedStyle(name="legenda", font=Font(bold=True)),
+    ])
+    return _estilos_planilha_processo
+
+def _nova_pasta_trabalho() -> Tuple["openpyxl.Workbook", Dict[str, "StyleArray"]]:
+    """
+    Workbook em modo write-only (as linhas vão direto para o arquivo) com os estilos nomeados.
+
+    Os mesmos objetos NamedStyle são registrados em cada workbook novo. Ao ser registrado,
+    o estilo calcula os índices de fonte, preenchimento e alinhamento daquele workbook; a
+    cópia desses índices (StyleArray) é devolvida por nome, e as células recebem a cópia no
+    construtor em vez de procurar o estilo pelo nome a cada célula.
+
+    Returns:
+        Tupla (workbook, estilos), com estilos[nome] = StyleArray do estilo no workbook
+    """
+    import openpyxl
+
+    pasta_trabalho = openpyxl.Workbook(write_only=True)
+    estilos = {}
+    for estilo in _estilos_planilha():
+        pasta_trabalho.add_named_style(estilo)
+        estilos[estilo.name] = copy.copy(estilo.as_tuple())
+    return pasta_trabalho, estilos
+
+def _celula(planilha, valor, estilo: "StyleArray"):
+    # Célula write-only já com o estilo (equivale a WriteOnlyCell com cell.style = nome)
+    from openpyxl.cell import Cell
+
+    return Cell(planilha, row=1, column=1, value=valor, style_array=estilo)
+
+def _montar_grade(linhas: List[Dict], modo: str):
+    """
+    Monta a grade linhas de horário x dias e a legenda a partir das linhas de um CSV de horários.
+
+    Returns:
+        Tupla (grade, legenda), com grade[linha][dia] = texto da célula
+    """
+    grade, legenda = _nova_grade()
+    for linha in linhas:
+        dia = int(linha["Dia da Semana"])
+        if dia < 1 or dia > 5:
+            continue
+        _preencher_grade(grade, legenda, dia - 1, linha["Horário"], *_textos_celula(
+            modo, linha["Código da Disciplina"], linha["Nome da Disciplina"], linha["Curso"],
+            linha["Período"], linha["Professor"]))
+    return grade, legenda
+
+def _nova_grade():
+    return [["-- -- -- --"] * 5 for _ in LINHAS_HORARIO_PLANILHA], {}
+
+def _textos_celula(modo: str, codigo: str, nome: str, curso: str, periodo: str, professores: str):
+    # Texto da célula da grade e da legenda de uma disciplina
+    if modo == 'aluno':
+        return codigo, f"{codigo}: {nome} - {professores}"
+    codigo = f"{codigo} - {curso} - {periodo}"
+    return codigo, f"{codigo}: {nome} - {curso} - {periodo}"
+
+def _preencher_grade(grade: List[List[str]], legenda: Dict[str, str], dia: int, turno: str, codigo: str, texto: str):
+    inicio, fim = LINHAS_TURNO_PLANILHA[turno]
+    for i in range(inicio, fim):
+        grade[i][dia] = codigo
+    if codigo not in legenda:
+        legenda[codigo] = texto
+
+def _escrever_aba(pasta_trabalho: "openpyxl.Workbook", estilos: Dict[str, "StyleArray"], titulo_aba: str,
+                  titulo: str, grade: List[List[str]], legenda: Dict[str, str]):
+    """Escreve uma aba de horários (cabeçalho, grade e legenda) em um workbook write-only."""
+    from openpyxl.utils import get_column_letter
+
+    planilha = pasta_trabalho.create_sheet(title=titulo_aba)
+    cabecalho, subcabecalho, linha, estilo_legenda = (estilos["cabecalho"], estilos["subcabecalho"],
+                                                       estilos["linha"], estilos["legenda"])
+
+    # Configurações de coluna (antes de qualquer linha, exigência do modo write-only)
+    for coluna in range(1, 7):
+        planilha.column_dimensions[get_column_letter(coluna)].width = 35
+
+    # Cabeçalho principal
+    planilha.merged_cells.add("A1:G1")
+    planilha.append([_celula(planilha, titulo, cabecalho)])
+
+    # Subcabeçalho
+    planilha.append([_celula(planilha, dia, subcabecalho) for dia in ["Horários", "Seg", "Ter", "Qua", "Qui", "Sex"]])
+
+    # Horários
+    for horario, valores in zip(LINHAS_HORARIO_PLANILHA, grade):
+        planilha.append([_celula(planilha, horario, linha)] + [_celula(planilha, valor, linha) for valor in valores])
+
+    # Legenda
+    planilha.append([])
+    planilha.append([_celula(planilha, "Legenda:", estilo_legenda)])
+    for texto in legenda.values():
+        planilha.append([texto])
+
+def _gerar_planilha_arquivo(caminho_arquivo: str, caminho_saida: str, modo: str) -> str:
+    # Lê o arquivo CSV
+    with open(caminho_arquivo, mode="r", encoding="utf-8") as arquivo:
+        dados = list(csv.DictReader(arquivo))
+
+    pasta_trabalho, estilos = _nova_pasta_trabalho()
+
+    if modo == 'aluno':
+        # Uma aba por curso e período
+        curso_periodo = defaultdict(list)
+        for linha in dados:
+            curso_periodo[(linha["Curso"], linha["Período"])].append(linha)
+        for (curso, periodo), linhas in curso_periodo.items():
+            _escrever_aba(pasta_trabalho, estilos, f"{curso} {periodo}", f"{curso} {periodo}",
+                          *_montar_grade(linhas, modo))
+    else:  # modo professor
+        _escrever_aba(pasta_trabalho, estilos, "Horários", "Horários de Aulas", *_montar_grade(dados, modo))
+
+    # Salva o arquivo Excel
+    pasta_trabalho.save(caminho_saida)
+    return caminho_saida
+
+def exportar_planilha_consolidada(horarios: List[Dict], nos: List[Disciplina],
+                                  caminho: str = os.path.join("controle", "horarios.xlsx"),
+                                  abas_por_entidade: bool = True) -> str:
+    """
+    Exporta o agendamento em um único workbook, direto de horarios e nos, sem passar pelos CSVs.
+
+    O workbook tem uma aba "Global" com as mesmas colunas de controle/horario_global.csv,
+    uma aba por turma (curso e período, como as planilhas de aluno) e uma por professor
+    (como as planilhas de professor). Os nós são percorridos uma única vez com o índice
+    cor -> (dia, turno): as linhas da aba global vão direto para o arquivo e as grades
+    das turmas e dos professores (15 x 5 células cada) são montadas na mesma passada.
+
+    Quase todo o tempo vai para as abas por turma e por professor (cada uma com cerca de
+    cem células estilizadas); com abas_por_entidade=False só a aba "Global" é gerada, o
+    que em instâncias grandes é uma ordem de grandeza mais rápido.
+
+    Args:
+        horarios: Grade de horários (um dicionário turno -> cor por dia)
+        nos: Lista de objetos Disciplina com as cores do agendamento
+        caminho: Arquivo .xlsx de destino
+        abas_por_entidade: Gera as abas por turma e por professor (padrão: True)
+
+    Returns:
+        Caminho do arquivo salvo
+    """
+    if os.path.dirname(caminho):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+
+    pasta_trabalho, estilos = _nova_pasta_trabalho()
+    planilha_global = pasta_trabalho.create_sheet(title="Global")
+    for coluna, largura in zip("ABCDEFG", (20, 10, 22, 50, 15, 15, 10)):
+        planilha_global.column_dimensions[coluna].width = largura
+    planilha_global.append([_celula(planilha_global, campo, estilos["subcabecalho"]) for campo in CAMPOS_HORARIO_GLOBAL])
+
+    grades_turmas = defaultdict(_nova_grade)
+    grades_professores = defaultdict(_nova_grade)
+    horarios_por_cor = indiceHorariosPorCor(horarios)
+
+    for disciplina in nos:
+        professores = ', '.join(map(str, disciplina.professores))
+        if not abas_por_entidade:
+            for dia, turno in horarios_por_cor.get(disciplina.cor, ()):
+                planilha_global.append([disciplina.curso, disciplina.periodo, disciplina.codigo, disciplina.nome,
+                                        dia + 1, professores, turno])
+            continue
+
+        grade_turma = grades_turmas[(disciplina.curso, disciplina.periodo)]
+        textos_turma = _textos_celula('aluno', disciplina.codigo, disciplina.nome, disciplina.curso,
+                                      disciplina.periodo, professores)
+        textos_professor = _textos_celula('professor', disciplina.codigo, disciplina.nome, disciplina.curso,
+                                          disciplina.periodo, professores)
+
+        for dia, turno in horarios_por_cor.get(disciplina.cor, ()):
+            planilha_global.append([disciplina.curso, disciplina.periodo, disciplina.codigo, disciplina.nome,
+                                    dia + 1, professores, turno])
+            _preencher_grade(*grade_turma, dia, turno, *textos_turma)
+            for prof in disciplina.professores:
+                _preencher_grade(*grades_professores[prof], dia, turno, *textos_professor)
+
+    for (curso, periodo), (grade, legenda) in sorted(grades_turmas.items()):
+        _escrever_aba(pasta_trabalho, estilos, f"{curso} {periodo}", f"{curso} {periodo}", grade, legenda)
+    for prof, (grade, legenda) in sorted(grades_professores.items()):
+        _escrever_aba(pasta_trabalho, estilos, f"Prof {prof}", f"Horários de Aulas - Prof {prof}", grade, legenda)
+
+    pasta_trabalho.save(caminho)
+    return caminho
+
+def _hash_arquivo(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 16), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def gerar_planilha_horarios(diretorio_csv, diretorio_xlsx, modo='professor', trabalhadores: Optional[int] = None,
+                            forcar: bool = False, perfil: Optional[PerfilExecucao] = None):
     """
     Gera planilhas de horários a partir de arquivos CSV.
+
+    As planilhas são escritas em modo write-only com estilos nomeados compartilhados. Com
+    trabalhadores > 1, os arquivos são gerados em paralelo em um pool de processos.
+
+    Um manifesto (ARQUIVO_MANIFESTO_PLANILHAS, dentro de diretorio_xlsx) guarda o hash de
+    cada CSV de origem, o modo e a VERSAO_ESTILO_PLANILHA. Só são refeitas as planilhas
+    cujo CSV mudou ou que não existem, ou todas se o modo ou a versão do estilo mudaram.
+    Planilhas registradas no manifesto cujo CSV de origem não existe mais são removidas;
+    outros arquivos da pasta não são tocados.
     
     Parâmetros:
     - diretorio_csv: Diretório de origem dos arquivos CSV
     - diretorio_xlsx: Diretório de destino das planilhas Excel
     - modo: 'professor' ou 'aluno' (padrão: 'professor')
+    - trabalhadores: Quantidade de processos (padrão: None, um arquivo por vez)
+    - forcar: Refaz todas as planilhas, ignorando o manifesto (padrão: False)
+    - perfil: PerfilExecucao que mede a verificação do manifesto e a geração (padrão: None)
     """
-    # Configurações de estilo
-    preenchimento_cabecalho = PatternFill(start_color="4b598b", end_color="4b598b", fill_type="solid")
-    fonte_cabecalho = Font(color="FFFFFF", bold=True)
-    preenchimento_subcabecalho = PatternFill(start_color="333366", end_color="333366", fill_type="solid")
-    fonte_subcabecalho = Font(color="FFFFFF", bold=True)
-    preenchimento_linha = PatternFill(start_color="f9fbfd", end_color="f9fbfd", fill_type="solid")
-    fonte_linha = Font(color="000000")
-    alinhamento_centro = Alignment(horizontal="center", vertical="center")
-
-    def processar_horario(horario, dia, horarios, codigo_disciplina):
-        """Processa os horários das disciplinas"""
-        mapeamento = {
-            "M123": (0, 3),
-            "M45": (3, 5),
-            "T12": (5, 7),
-            "T345": (7, 10),
-            "N12": (10, 12),
-            "N345": (12, 15),
-        }
-        inicio, fim = mapeamento[horario]
-        for i in range(inicio, fim):
-            horarios[i][dia] = codigo_disciplina
+    if perfil is None:
+        perfil = PerfilExecucao(ativo=False)
 
     # Cria o diretório de saída, se não existir
     os.makedirs(diretorio_xlsx, exist_ok=True)
 
-    # Processa todos os arquivos CSV na pasta especificada
-    for nome_arquivo in os.listdir(diretorio_csv):
-        if nome_arquivo.endswith(".csv"):
+    with perfil.etapa(f'manifesto_{modo}'):
+        caminho_manifesto = os.path.join(diretorio_xlsx, ARQUIVO_MANIFESTO_PLANILHAS)
+        anteriores = {}
+        if not forcar and os.path.exists(caminho_manifesto):
+            with open(caminho_manifesto, encoding='utf-8') as f:
+                manifesto = json.load(f)
+            if manifesto.get('versao_estilo') == VERSAO_ESTILO_PLANILHA and manifesto.get('modo') == modo:
+                anteriores = manifesto['arquivos']
+
+        # Processa todos os arquivos CSV na pasta especificada
+        hashes = {}
+        tarefas = []
+        for nome_arquivo in os.listdir(diretorio_csv):
+            if not nome_arquivo.endswith(".csv"):
+                continue
             caminho_arquivo = os.path.join(diretorio_csv, nome_arquivo)
-            
-            # Lê o arquivo CSV
-            with open(caminho_arquivo, mode="r", encoding="utf-8") as arquivo:
-                leitor = csv.DictReader(arquivo)
-                dados = list(leitor)
-
-            # Cria um novo workbook
-            pasta_trabalho = openpyxl.Workbook()
-
-            if modo == 'aluno':
-                # Itera por curso e período para alunos
-                curso_periodo = {}
-                for linha in dados:
-                    chave = (linha["Curso"], linha["Período"])
-                    if chave not in curso_periodo:
-                        curso_periodo[chave] = []
-                    curso_periodo[chave].append(linha)
-
-                # Processa cada curso e período
-                for (curso, periodo), linhas in curso_periodo.items():
-                    planilha = pasta_trabalho.create_sheet(title=f"{curso} {periodo}")
-                    pasta_trabalho.active = planilha
-
-                    # Cabeçalho principal
-                    planilha.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
-                    planilha["A1"] = f"{curso} {periodo}"
-                    planilha["A1"].fill = preenchimento_cabecalho
-                    planilha["A1"].font = fonte_cabecalho
-                    planilha["A1"].alignment = alinhamento_centro
-
-                    # Subcabeçalho e configurações básicas
-                    dias = ["Horários", "Seg", "Ter", "Qua", "Qui", "Sex"]
-                    for num_coluna, dia in enumerate(dias, start=1):
-                        celula = planilha.cell(row=2, column=num_coluna, value=dia)
-                        celula.fill = preenchimento_subcabecalho
-                        celula.font = fonte_subcabecalho
-                        celula.alignment = alinhamento_centro
-
-                    # Configurações de coluna
-                    for coluna in range(1, 7):
-                        planilha.column_dimensions[openpyxl.utils.get_column_letter(coluna)].width = 35
-
-                    # Adiciona horários
-                    horarios = [
-                        "07:00 - 07:55", "07:55 - 08:50", "08:50 - 09:45",
-                        "10:10 - 11:05", "11:05 - 12:00",
-                        "13:30 - 14:25", "14:25 - 15:20", "15:45 - 16:40", "16:40 - 17:35", "17:35 - 18:30",
-                        "19:00 - 19:50", "19:50 - 20:40", "21:00 - 21:50", "21:50 - 22:40", "22:40 - 23:30"
-                    ]
-                    linhas_horario = [["-- -- -- --"] * 5 for _ in horarios]
-
-                    for num_linha, horario in enumerate(horarios, start=3):
-                        planilha.cell(row=num_linha, column=1, value=horario).fill = preenchimento_linha
-                        planilha.cell(row=num_linha, column=1).font = fonte_linha
-                        planilha.cell(row=num_linha, column=1).alignment = alinhamento_centro
-
-                    # Popula horários e legenda
-                    legenda = {}
-                    for linha in linhas:
-                        dia = int(linha["Dia da Semana"])
-                        if dia < 1 or dia > 5:
-                            continue
-                        dia -= 1
-
-                        codigo = linha["Código da Disciplina"]
-                        processar_horario(linha["Horário"], dia, linhas_horario, codigo)
-
-                        if codigo not in legenda:
-                            legenda[codigo] = f"{codigo}: {linha['Nome da Disciplina']} - {linha['Professor']}"
-
-                    # Preenche planilha
-                    for num_linha, horario in enumerate(linhas_horario, start=3):
-                        for num_coluna, valor in enumerate(horario, start=2):
-                            celula = planilha.cell(row=num_linha, column=num_coluna, value=valor)
-                            celula.fill = preenchimento_linha
-                            celula.font = fonte_linha
-                            celula.alignment = alinhamento_centro
-
-                    # Adiciona legenda
-                    linha_legenda_inicio = len(horarios) + 4
-                    planilha.cell(row=linha_legenda_inicio, column=1, value="Legenda:").font = Font(bold=True)
-                    for i, texto in enumerate(legenda.values(), start=linha_legenda_inicio + 1):
-                        planilha.cell(row=i, column=1, value=texto)
-
-                # Remove aba padrão
-                pasta_trabalho.remove(pasta_trabalho["Sheet"])
-
-            else:  # modo professor
-                planilha = pasta_trabalho.active
-                planilha.title = "Horários"
-
-                # Cabeçalho principal
-                planilha.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
-                planilha["A1"] = "Horários de Aulas"
-                planilha["A1"].fill = preenchimento_cabecalho
-                planilha["A1"].font = fonte_cabecalho
-                planilha["A1"].alignment = alinhamento_centro
-
-                # Subcabeçalho
-                dias = ["Horários", "Seg", "Ter", "Qua", "Qui", "Sex"]
-                for num_coluna, dia in enumerate(dias, start=1):
-                    celula = planilha.cell(row=2, column=num_coluna, value=dia)
-                    celula.fill = preenchimento_subcabecalho
-                    celula.font = fonte_subcabecalho
-                    celula.alignment = alinhamento_centro
-
-                # Configurações de coluna
-                for coluna in range(1, 7):
-                    planilha.column_dimensions[openpyxl.utils.get_column_letter(coluna)].width = 35
-
-                # Adiciona horários
-                horarios = [
-                    "07:00 - 07:55", "07:55 - 08:50", "08:50 - 09:45",
-                    "10:10 - 11:05", "11:05 - 12:00",
-                    "13:30 - 14:25", "14:25 - 15:20", "15:45 - 16:40", "16:40 - 17:35", "17:35 - 18:30",
-                    "19:00 - 19:50", "19:50 - 20:40", "21:00 - 21:50", "21:50 - 22:40", "22:40 - 23:30"
-                ]
-                linhas_horario = [["-- -- -- --"] * 5 for _ in horarios]
-
-                for num_linha, horario in enumerate(horarios, start=3):
-                    planilha.cell(row=num_linha, column=1, value=horario).fill = preenchimento_linha
-                    planilha.cell(row=num_linha, column=1).font = fonte_linha
-                    planilha.cell(row=num_linha, column=1).alignment = alinhamento_centro
-
-                # Popula horários e legenda
-                legenda = {}
-                for linha in dados:
-                    dia = int(linha["Dia da Semana"])
-                    if dia < 1 or dia > 5:
-                        continue
-                    dia -= 1
-
-                    codigo = f"{linha['Código da Disciplina']} - {linha['Curso']} - {linha['Período']}"
-                    processar_horario(linha["Horário"], dia, linhas_horario, codigo)
-
-                    if codigo not in legenda:
-                        legenda[codigo] = f"{codigo}: {linha['Nome da Disciplina']} - {linha['Curso']} - {linha['Período']}"
-
-                # Preenche planilha
-                for num_linha, horario in enumerate(linhas_horario, start=3):
-                    for num_coluna, valor in enumerate(horario, start=2):
-                        celula = planilha.cell(row=num_linha, column=num_coluna, value=valor)
-                        celula.fill = preenchimento_linha
-                        celula.font = fonte_linha
-                        celula.alignment = alinhamento_centro
-
-                # Adiciona legenda
-                linha_legenda_inicio = len(horarios) + 4
-                planilha.cell(row=linha_legenda_inicio, column=1, value="Legenda:").font = Font(bold=True)
-                for i, texto in enumerate(legenda.values(), start=linha_legenda_inicio + 1):
-                    planilha.cell(row=i, column=1, value=texto)
-
-            # Salva o arquivo Excel
             caminho_saida = os.path.join(diretorio_xlsx, f"{os.path.splitext(nome_arquivo)[0]}.xlsx")
-            pasta_trabalho.save(caminho_saida)
-            print(f"Arquivo {caminho_saida} salvo com sucesso!")
-
-if __name__ == "__main__":
-    # Constrói o caminho para o arquivo CSV de forma compatível com qualquer sistema operacional
-    #caminho_csv = os.path.join("..", "datasets", "csv", "semestre1.csv")
-
-    # Chama a função com o caminho ajustado
-    #nos = carregarDisciplinasCsv(caminho_csv)
-    # arestas = fazerArestas(nos)
-    #arestas = criarListaAdjacencia(nos)
-
-    # print(arestas)
-    #    print(f'Quantidade de cores: {colorirGrafo(nos, arestas)}')
-
-    #    grafoPorTurmas = criarGrafoTurmas(nos)
-    # print(grafoPorTurmas)
+            hashes[nome_arquivo] = _hash_arquivo(caminho_arquivo)
+            if anteriores.get(nome_arquivo) != hashes[nome_arquivo] or not os.path.exists(caminho_saida):
+                tarefas.append((caminho_arquivo, caminho_saida))
+
+        # Remove planilhas órfãs: geradas antes (estão no manifesto), mas o CSV de origem não existe mais
+        for nome_arquivo in anteriores:
+            if nome_arquivo not in hashes:
+                caminho_saida = os.path.join(diretorio_xlsx, f"{os.path.splitext(nome_arquivo)[0]}.xlsx")
+                if os.path.exists(caminho_saida):
+                    os.remove(caminho_saida)
+                    print(f"Arquivo {caminho_saida} removido (sem CSV de origem)")
+
+    with perfil.etapa(f'planilhas_{modo}'):
+        if trabalhadores is not None and trabalhadores > 1 and len(tarefas) > 1:
+            with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+                salvos = executor.map(_gerar_planilha_arquivo, *zip(*tarefas), [modo] * len(tarefas))
+                for caminho_saida in salvos:
+                    print(f"Arquivo {caminho_saida} salvo com sucesso!")
+        else:
+            for caminho_arquivo, caminho_saida in tarefas:
+                _gerar_planilha_arquivo(caminho_arquivo, caminho_saida, modo)
+                print(f"Arquivo {caminho_saida} salvo com sucesso!")
+
+    perfil.contar('planilhas', len(tarefas))
+
+    # O manifesto só é gravado depois que todas as planilhas foram salvas
+    with open(caminho_manifesto + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({'versao_estilo': VERSAO_ESTILO_PLANILHA, 'modo': modo, 'arquivos': hashes},
+                  f, ensure_ascii=False, indent=2)
+    os.replace(caminho_manifesto + ".tmp", caminho_manifesto)
+    print(f"{len(tarefas)} planilhas geradas, {len(hashes) - len(tarefas)} sem alterações")
+
+FORMATOS_SAIDA = ['csv', 'xlsx', 'consolidado', 'png']
+
+def _lista_formatos(valor: str) -> List[str]:
+    formatos = [formato.strip() for formato in valor.split(',') if formato.strip()]
+    desconhecidos = [formato for formato in formatos if formato not in FORMATOS_SAIDA]
+    if desconhecidos:
+        raise argparse.ArgumentTypeError(f"formato desconhecido: {', '.join(desconhecidos)} "
+                                         f"(opções: {', '.join(FORMATOS_SAIDA)})")
+    return formatos
+
+def _exportar_planilhas(horarios: List[Dict], nos: List[Disciplina], formatos: List[str],
+                        trabalhadores: Optional[int], perfil: PerfilExecucao, abas_por_entidade: bool = True):
+    """Gera a planilha consolidada e as planilhas por professor e por turma pedidas em formatos."""
+    if 'consolidado' in formatos:
+        with perfil.etapa('planilha_consolidada'):
+            caminho_consolidada = exportar_planilha_consolidada(horarios, nos, abas_por_entidade=abas_por_entidade)
+        print(f"Arquivo {caminho_consolidada} salvo com sucesso!")
+    if 'xlsx' in formatos:
+        gerar_planilha_horarios('professor/csv', 'professor/xlsx', modo='professor',
+                                trabalhadores=trabalhadores, perfil=perfil)
+        gerar_planilha_horarios('aluno/csv', 'aluno/xlsx', modo='aluno',
+                                trabalhadores=trabalhadores, perfil=perfil)
+
+def _comando_solve(args) -> int:
+    """Resolve cada entrada e gera as saídas de args.formatos em args.saida (uma subpasta por entrada)."""
+    entradas = [os.path.abspath(entrada) for entrada in args.entradas]
+    falhas = 0
+
+    for entrada in entradas:
+        diretorio = args.saida
+        if len(entradas) > 1:
+            diretorio = os.path.join(args.saida, os.path.splitext(os.path.basename(entrada))[0])
+        os.makedirs(diretorio, exist_ok=True)
+        diretorio_original = os.getcwd()
+        os.chdir(diretorio)
+        try:
+            perfil = PerfilExecucao(ativo=args.perfil or args.perfilar, perfilar=args.perfilar)
+            # As imagens são desenhadas em outro processo enquanto as planilhas são geradas
+            imagens = {'gerar_imagens': 'png' in args.formatos, 'imagens_em_segundo_plano': not args.imagens_sincronas,
+                       'formato_imagem': args.formato_imagem, 'dpi_imagem': DPI_PREVIA if args.previa else DPI_IMAGEM}
+
+            opcoes = dict(motor=args.motor, pos_processamento=args.pos_processamento, alocador=args.alocador,
+                          por_componentes=args.por_componentes, trabalhadores=args.trabalhadores,
+                          usar_cache=not args.sem_cache,
+                          invalidar_cache=args.invalidar_cache, perfil=perfil, **imagens)
+            if args.incremental:
+                with perfil.etapa('incremental'):
+                    horarios, nos = processo_agendamento_incremental(entrada, opcoes_completo=opcoes)
+            elif args.prazo is None:
+                horarios, nos = processo_agendamento_principal(entrada, **opcoes)
+            elif args.trabalhadores is not None and args.trabalhadores > 1:
+                with perfil.etapa('portfolio'):
+                    horarios, nos = processo_agendamento_portfolio(
+                        entrada, trabalhadores=args.trabalhadores, tempo_limite=args.prazo, criterio=args.criterio,
+                        pos_processamento=args.pos_processamento, alocador=args.alocador, **imagens)
+            else:
+                with perfil.etapa('busca_com_prazo'):
+                    resultado = processo_agendamento_com_prazo(
+                        entrada, prazo=args.prazo, pos_processamento=args.pos_processamento,
+                        alocador=args.alocador, **imagens)
+                print(resultado)
+                horarios, nos = resultado.horarios, resultado.nos
+
+            if horarios is None:
+                print(f"Nenhum agendamento válido para {entrada}")
+                falhas += 1
+                continue
 
-    #    horarios = fazerDivisaoHorario(nos, arestas)
+            _exportar_planilhas(horarios, nos, args.formatos, args.trabalhadores, perfil,
+                                abas_por_entidade=not args.consolidado_global)
+            perfil.salvar(ARQUIVO_PERFIL)
+        finally:
+            os.chdir(diretorio_original)
+
+    for caminho in aguardar_renderizacoes():
+        print(f"Imagem {caminho} salva com sucesso!")
+    return 1 if falhas else 0
+
+def _desenhar_grafos(agendamento: SnapshotAgendamento, args):
+    renderizar_grafos(agendamento.disciplinas(), agendamento.lista_adjacencia(), formato=args.formato_imagem,
+                      dpi=DPI_PREVIA if args.previa else DPI_IMAGEM)
+
+def _comando_export(args) -> int:
+    """Gera CSVs e planilhas a partir do snapshot de um agendamento já resolvido."""
+    snapshot = os.path.abspath(args.snapshot) if args.snapshot else ARQUIVO_SNAPSHOT
+    os.makedirs(args.saida, exist_ok=True)
+    diretorio_original = os.getcwd()
+    os.chdir(args.saida)
+    try:
+        with SnapshotAgendamento(snapshot) as agendamento:
+            horarios = agendamento.horarios()
+            if horarios is None:
+                print(f"O snapshot {snapshot} não tem grade de horários")
+                return 1
+            nos = agendamento.disciplinas()
+
+            perfil = PerfilExecucao(ativo=args.perfil or args.perfilar, perfilar=args.perfilar)
+            # As planilhas por professor e por turma são geradas a partir dos CSVs
+            if 'csv' in args.formatos or 'xlsx' in args.formatos:
+                with perfil.etapa('exportacao_csv'):
+                    exportar_horarios(horarios, nos)
+            _exportar_planilhas(horarios, nos, args.formatos, args.trabalhadores, perfil,
+                                abas_por_entidade=not args.consolidado_global)
+            if 'png' in args.formatos:
+                with perfil.etapa('imagens'):
+                    _desenhar_grafos(agendamento, args)
+            perfil.salvar(ARQUIVO_PERFIL)
+    finally:
+        os.chdir(diretorio_original)
+    return 0
+
+def _comando_render(args) -> int:
+    """Desenha os grafos de disciplinas e de restrições a partir do snapshot."""
+    snapshot = os.path.abspath(args.snapshot) if args.snapshot else ARQUIVO_SNAPSHOT
+    os.makedirs(args.saida, exist_ok=True)
+    diretorio_original = os.getcwd()
+    os.chdir(args.saida)
+    try:
+        with SnapshotAgendamento(snapshot) as agendamento:
+            _desenhar_grafos(agendamento, args)
+    finally:
+        os.chdir(diretorio_original)
+    return 0
+
+def _comando_bench(args) -> int:
+    # Importado aqui porque benchmark importa main
+    from benchmark import executar_benchmark
+    resultados = executar_benchmark(tamanhos=args.tamanhos, periodos=args.periodos,
+                                    disciplinas_por_periodo=args.disciplinas_por_periodo,
+                                    compartilhamento=args.compartilhamento, memoria=not args.sem_memoria,
+                                    exportar=not args.sem_exportar, semente=args.semente,
+                                    caminho_relatorio=args.relatorio)
+    # Instâncias sem alocação não medem os exportadores: o resultado está incompleto
+    return 0 if all(resultado['contadores']['alocado'] for resultado in resultados) else 1
+
+def criar_parser_cli() -> argparse.ArgumentParser:
+    """Monta o parser da linha de comando, com os subcomandos solve, export, render e bench."""
+    parser = argparse.ArgumentParser(description="Agendamento de horários acadêmicos por coloração de grafos.")
+    subcomandos = parser.add_subparsers(dest='comando', metavar='{solve,export,render,bench}')
+
+    solve = subcomandos.add_parser('solve', help="Resolve uma ou mais instâncias e exporta os horários")
+    solve.add_argument('entradas', nargs='*', metavar='ENTRADA',
+                       default=[os.path.join("..", "datasets", "csv", "semestre1.csv")],
+                       help="CSVs (formato largo ou longo) ou snapshots .npz (padrão: semestre1.csv); "
+                            "com mais de uma entrada, cada uma vai para uma subpasta de --saida")
+    solve.add_argument('--motor', choices=list(MOTORES_COLORACAO), default=None,
+                       help="Motor de coloração (padrão: dsatur); não combina com --prazo, que busca entre "
+                            "as estratégias de coloração")
+    solve.add_argument('--pos-processamento', choices=list(POS_PROCESSAMENTOS), default=None,
+                       help="Redução de cores aplicada depois da coloração")
+    solve.add_argument('--alocador', choices=list(ALOCADORES_HORARIO), default='emparelhamento',
+                       help="Alocador de horários (padrão: emparelhamento)")
+    solve.add_argument('--prazo', type=float, default=None, metavar='SEGUNDOS',
+                       help="Busca o melhor agendamento entre as estratégias de coloração até o prazo "
+                            "(com --trabalhadores maior que 1, em um portfólio de processos)")
+    solve.add_argument('--criterio', choices=['primeiro', 'melhor'], default=None,
+                       help="Critério do portfólio (--prazo com --trabalhadores maior que 1): para no primeiro "
+                            "agendamento válido ou fica com o de menos cores (padrão: melhor)")
+    solve.add_argument('--por-componentes', action='store_true',
+                       help="Colore as componentes conexas separadamente, em paralelo com --trabalhadores")
+    solve.add_argument('--incremental', action='store_true',
+                       help=f"Reagenda só o que mudou desde o {ARQUIVO_ESTADO} salvo em --saida "
+                            "(sem ele, executa o agendamento completo)")
+    solve.add_argument('--sem-cache', action='store_true',
+                       help="Não lê nem grava o cache de resultados (a busca com --prazo nunca usa o cache)")
+    solve.add_argument('--invalidar-cache', action='store_true', help="Descarta a entrada do cache e recalcula")
+    solve.add_argument('--formatos', type=_lista_formatos, default=list(FORMATOS_SAIDA),
+                       help=f"Saídas separadas por vírgula (padrão: {','.join(FORMATOS_SAIDA)}); "
+                            "os CSVs são sempre gerados")
+    solve.add_argument('--headless', action='store_true',
+                       help="Não desenha os grafos (o mesmo que tirar png de --formatos)")
+    solve.add_argument('--imagens-sincronas', action='store_true',
+                       help="Desenha os grafos antes de retornar o agendamento, em vez de em segundo plano")
+
+    export = subcomandos.add_parser('export', help="Exporta CSVs e planilhas de um agendamento salvo")
+    export.add_argument('--formatos', type=_lista_formatos, default=['csv', 'xlsx', 'consolidado'],
+                        help="Saídas separadas por vírgula (padrão: csv,xlsx,consolidado; png também "
+                             "desenha os grafos)")
+
+    render = subcomandos.add_parser('render', help="Desenha os grafos de um agendamento salvo")
+
+    for comando in (export, render):
+        comando.add_argument('--snapshot', default=None,
+                             help=f"Snapshot do agendamento (padrão: {ARQUIVO_SNAPSHOT} em --saida)")
+
+    for comando in (solve, export, render):
+        comando.add_argument('--saida', default='.', metavar='DIRETORIO',
+                             help="Diretório raiz das saídas (padrão: diretório atual)")
+        comando.add_argument('--formato-imagem', choices=['png', 'svg'], default='png',
+                             help="Formato das imagens dos grafos (padrão: png)")
+        comando.add_argument('--previa', action='store_true',
+                             help=f"Imagens em baixa resolução ({DPI_PREVIA} dpi em vez de {DPI_IMAGEM}), mais rápidas")
+    for comando in (solve, export):
+        comando.add_argument('--trabalhadores', type=int, default=None,
+                             help="Processos para a coloração, o portfólio e as planilhas (padrão: um)")
+        comando.add_argument('--perfil', action='store_true', help=f"Grava {ARQUIVO_PERFIL} com o tempo de cada etapa")
+        comando.add_argument('--perfilar', action='store_true',
+                             help="Implica --perfil e roda cada etapa sob o cProfile, gravando as estatísticas da "
+                                  "etapa mais lenta em perfil_execucao.prof (legível com pstats)")
+        comando.add_argument('--consolidado-global', action='store_true',
+                             help="Planilha consolidada só com a aba Global, sem as abas por turma e por "
+                                  "professor (bem mais rápida em instâncias grandes)")
+
+    bench = subcomandos.add_parser('bench', help="Mede as etapas do pipeline em instâncias sintéticas")
+    bench.add_argument('--tamanhos', type=int, nargs='+', default=[500, 1000, 2000],
+                       help="Quantidades aproximadas de disciplinas (padrão: 500 1000 2000; a partir de "
+                            "cerca de 4000 a instância gerada não é agendada e o código de saída é 1)")
+    bench.add_argument('--periodos', type=int, default=4)
+    bench.add_argument('--disciplinas-por-periodo', type=int, default=5)
+    bench.add_argument('--compartilhamento', type=float, default=0.08)
+    bench.add_argument('--semente', type=int, default=42)
+    bench.add_argument('--sem-memoria', action='store_true', help="Não mede o pico de memória (mais rápido)")
+    bench.add_argument('--sem-exportar', action='store_true', help="Não mede os exportadores")
+    bench.add_argument('--relatorio', default='benchmark.json', help="Arquivo JSON dos resultados")
+
+    return parser
+
+COMANDOS_CLI = {
+    'solve': _comando_solve,
+    'export': _comando_export,
+    'render': _comando_render,
+    'bench': _comando_bench,
+}
+
+def _validar_argumentos_solve(parser: argparse.ArgumentParser, args):
+    """Rejeita combinações de opções do solve que seriam ignoradas e preenche os padrões que dependem do modo."""
+    if args.headless:
+        args.formatos = [formato for formato in args.formatos if formato != 'png']
+
+    portfolio = args.prazo is not None and args.trabalhadores is not None and args.trabalhadores > 1
+    if args.prazo is not None:
+        # A busca com prazo alterna entre as estratégias de coloração e não passa pelo cache
+        for opcao, valor in (('--motor', args.motor is not None), ('--por-componentes', args.por_componentes),
+                             ('--sem-cache', args.sem_cache), ('--invalidar-cache', args.invalidar_cache),
+                             ('--incremental', args.incremental)):
+            if valor:
+                parser.error(f"{opcao} não pode ser combinado com --prazo")
+    if args.criterio is not None and not portfolio:
+        parser.error("--criterio só vale para o portfólio (--prazo com --trabalhadores maior que 1)")
+    if args.incremental and any(entrada.endswith('.npz') for entrada in args.entradas):
+        parser.error("--incremental exige entradas CSV")
+
+    if args.motor is None:
+        args.motor = 'dsatur'
+    if args.criterio is None:
+        args.criterio = 'melhor'
+
+def executar_cli(argv: Optional[List[str]] = None) -> int:
+    """
+    Executa a linha de comando e retorna o código de saída.
 
-    # print(horarios)
+    Sem subcomando, executa solve com os valores padrão (semestre1.csv, DSatur e todas as
+    saídas). O perfil de execução só é medido com --perfil ou --perfilar: o tracemalloc
+    deixa o agendamento várias vezes mais lento.
+    """
+    configurar_log()
+    parser = criar_parser_cli()
+    args = parser.parse_args(argv)
+    if args.comando is None:
+        args = parser.parse_args(['solve'])
+    if args.comando == 'solve':
+        _validar_argumentos_solve(parser, args)
+    return COMANDOS_CLI[args.comando](args)
 
-    # Exibe os horários formatados
-    #    exibirHorariosPorTurma(horarios, nos)
 
-    processo_agendamento_principal()
-    gerar_planilha_horarios('professor/csv', 'professor/xlsx', modo='professor')
-    gerar_planilha_horarios('aluno/csv', 'aluno/xlsx', modo='aluno')
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(executar_cli())
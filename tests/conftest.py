@@ -0,0 +1,107 @@
+import itertools
+import os
+import random
+import sys
+
+import pytest
+
+# main.py e o pacote classes são importados a partir de src, como em "cd src && python main.py"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from classes.Disciplina import Disciplina
+from main import carregarTabelaDisciplinas, criarListaAdjacencia, mascaraTurnosPermitidos
+
+DATASETS = os.path.join(os.path.dirname(__file__), "..", "datasets", "csv")
+
+
+def criar_grafo_aleatorio(n: int, densidade: float, semente: int, cursos=('CCO',), cargas=(2,)):
+    """
+    Nós Disciplina com curso e carga sorteados e arestas independentes com probabilidade densidade.
+
+    Cada nó tem turma e professor próprios: turmas e professores em comum implicam arestas
+    (encontrarCliqueMaximal parte desses grupos), e aqui as arestas são só as sorteadas.
+    """
+    gerador = random.Random(semente)
+    nos = [Disciplina(i, gerador.choice(cursos), '2019', str(i), f"D{i}", f"Disciplina {i}",
+                      gerador.choice(cargas), [i]) for i in range(n)]
+    arestas = {i: set() for i in range(n)}
+    for i, j in itertools.combinations(range(n), 2):
+        if gerador.random() < densidade:
+            arestas[i].add(j)
+            arestas[j].add(i)
+    return nos, arestas
+
+
+def verificar_coloracao(nos, arestas, cores: int):
+    """Cores diferentes nas pontas de cada aresta, turnos em comum em cada classe e cores igual às usadas."""
+    for i, vizinhos in arestas.items():
+        assert nos[i].cor is not None
+        for j in vizinhos:
+            assert nos[i].cor != nos[j].cor, f"aresta {i}-{j} com a cor {nos[i].cor}"
+
+    mascaras = {}
+    for no in nos:
+        mascaras[no.cor] = mascaras.get(no.cor, -1) & mascaraTurnosPermitidos(no)
+    assert all(mascaras.values()), "classe de cor sem turno em comum"
+    assert len(mascaras) == cores
+
+
+def numero_cromatico(arestas, nos=None) -> int:
+    """
+    Número cromático por força bruta (só para grafos pequenos).
+
+    Com nos, cada classe de cor também precisa de um turno em comum entre as máscaras
+    dos seus nós, como nas colorações do agendamento.
+    """
+    n = len(arestas)
+    lista = [(i, j) for i in arestas for j in arestas[i] if i < j]
+    mascaras = [mascaraTurnosPermitidos(no) for no in nos] if nos is not None else [-1] * n
+    for k in range(1, n + 1):
+        for cores in itertools.product(range(k), repeat=n):
+            if all(cores[i] != cores[j] for i, j in lista):
+                mascara_classe = {}
+                for i, cor in enumerate(cores):
+                    mascara_classe[cor] = mascara_classe.get(cor, -1) & mascaras[i]
+                if all(mascara_classe.values()):
+                    return k
+    return n
+
+
+def carregar_semestre(nome: str):
+    """(tabela, nós, arestas) de um dos CSVs de datasets/csv."""
+    tabela = carregarTabelaDisciplinas(os.path.join(DATASETS, nome))
+    return tabela, tabela.nos, criarListaAdjacencia(tabela.nos, tabela)
+
+
+def subgrafo_induzido(nos, arestas, indices):
+    """Cópias renumeradas dos nós em indices e as arestas entre eles."""
+    posicao = {i: p for p, i in enumerate(indices)}
+    sub_nos = [Disciplina(p, nos[i].curso, nos[i].ppc, nos[i].periodo, nos[i].codigo, nos[i].nome, nos[i].ch,
+                          list(nos[i].professores)) for p, i in enumerate(indices)]
+    sub_arestas = {posicao[i]: {posicao[j] for j in arestas[i] if j in posicao} for i in indices}
+    return sub_nos, sub_arestas
+
+
+@pytest.fixture
+def grafo_aleatorio():
+    return criar_grafo_aleatorio
+
+
+@pytest.fixture
+def coloracao_valida():
+    return verificar_coloracao
+
+
+@pytest.fixture
+def cromatico():
+    return numero_cromatico
+
+
+@pytest.fixture
+def semestre():
+    return carregar_semestre
+
+
+@pytest.fixture
+def subgrafo():
+    return subgrafo_induzido
@@ -0,0 +1,146 @@
+import logging
+import os
+import random
+
+import pytest
+
+import main
+from benchmark import gerarInstanciaSintetica
+from classes.Disciplina import Disciplina
+from main import (ROTULOS_2H_EM_BLOCO_3H, TURNOS, TURNOS_3H, alocarHorariosEmparelhamento, carregarTabelaDisciplinas,
+                  colorirGrafoDSatur, criarListaAdjacencia, mascaraTurnosPermitidos, validar_agendamento)
+
+DATASETS = os.path.join(os.path.dirname(__file__), "..", "datasets", "csv")
+TURNO_DO_ROTULO = {rotulo: turno for turno, rotulo in ROTULOS_2H_EM_BLOCO_3H.items()}
+
+
+def verificar_alocacao(horarios, nos):
+    """Cada classe de cor em um único horário, e cada disciplina em um turno compatível com seu curso e duração."""
+    horario_da_cor = {}
+    for dia, turnos in enumerate(horarios):
+        for turno, cor in turnos.items():
+            if cor is not None:
+                assert cor not in horario_da_cor, f"cor {cor} em dois horários"
+                horario_da_cor[cor] = (dia, turno)
+
+    for no in nos:
+        assert no.cor in horario_da_cor, f"{no.nome} sem horário"
+        _, turno = horario_da_cor[no.cor]
+        assert TURNO_DO_ROTULO.get(no.horario, no.horario) == turno
+        assert mascaraTurnosPermitidos(no) >> TURNOS.index(turno) & 1, f"{no.nome} ({no.curso}) em {turno}"
+        if no.ch == 3:
+            assert turno in TURNOS_3H and no.horario == turno
+        elif turno in TURNOS_3H:
+            # Aula de 2 horas em um bloco de 3 horas usa só as duas primeiras
+            assert no.horario == ROTULOS_2H_EM_BLOCO_3H[turno]
+
+
+def alocar(caminho_csv, semente=42):
+    tabela = carregarTabelaDisciplinas(caminho_csv)
+    nos = tabela.nos
+    arestas = criarListaAdjacencia(nos, tabela)
+    colorirGrafoDSatur(nos, arestas)
+    return alocarHorariosEmparelhamento(nos, arestas, semente=semente, tabela=tabela), nos, tabela
+
+
+@pytest.mark.parametrize("semestre", ["semestre1.csv", "semestre2.csv"])
+@pytest.mark.parametrize("semente", [42, 7, 2024])
+def test_semestres_alocados_em_turnos_compativeis(semestre, semente):
+    horarios, nos, tabela = alocar(os.path.join(DATASETS, semestre), semente)
+
+    assert horarios is not None
+    verificar_alocacao(horarios, nos)
+    assert validar_agendamento(horarios, nos, tabela) == []
+
+
+@pytest.mark.parametrize("semente", range(10))
+def test_instancias_sinteticas_alocadas_em_turnos_compativeis(semente, tmp_path):
+    caminho = gerarInstanciaSintetica(str(tmp_path / "instancia.csv"), cursos=6, semente=semente,
+                                      compartilhamento=0.2)
+
+    horarios, nos, tabela = alocar(caminho)
+
+    assert horarios is not None
+    verificar_alocacao(horarios, nos)
+    assert validar_agendamento(horarios, nos, tabela) == []
+
+
+def test_alocacao_anterior_e_mantida():
+    horarios, nos, _ = alocar(os.path.join(DATASETS, "semestre1.csv"))
+    anterior = {cor: (dia, turno) for dia, turnos in enumerate(horarios) for turno, cor in turnos.items()
+                if cor is not None}
+
+    novos = alocarHorariosEmparelhamento(nos, {}, semente=99, alocacao_anterior=anterior)
+
+    assert novos == horarios
+
+
+def test_sem_horarios_suficientes_retorna_none(caplog, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    # 11 aulas de SIN com o mesmo professor: 11 cores, e a semana só tem 10 horários noturnos
+    nos = [Disciplina(i, 'SIN', '2019', '1', f"D{i}", f"Disciplina {i}", 2, [1]) for i in range(11)]
+    arestas = {i: set(range(11)) - {i} for i in range(11)}
+    colorirGrafoDSatur(nos, arestas)
+
+    with caplog.at_level(logging.ERROR):
+        assert alocarHorariosEmparelhamento(nos, arestas) is None
+    assert "Nenhum horário compatível" in caplog.text
+    assert not os.listdir(tmp_path)
+
+
+def test_principal_para_na_primeira_falha_do_emparelhamento(monkeypatch, tmp_path, capsys):
+    monkeypatch.chdir(tmp_path)
+    # Mesma instância do teste acima: 11 cores para 10 horários noturnos, em qualquer semente
+    caminho_csv = tmp_path / "sem_horarios.csv"
+    linhas = ["Curso,PPC,Período,Código da Disciplina,Nome da Disciplina,CH,Prof 1"]
+    linhas += [f"SIN,2019,1,D{i},Disciplina {i},2,1" for i in range(11)]
+    caminho_csv.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    chamadas = []
+    original = main.ALOCADORES_HORARIO['emparelhamento']
+    monkeypatch.setitem(main.ALOCADORES_HORARIO, 'emparelhamento',
+                        lambda *args, **kwargs: chamadas.append(1) or original(*args, **kwargs))
+
+    assert main.processo_agendamento_principal(str(caminho_csv), usar_cache=False,
+                                               gerar_imagens=False) == (None, None)
+    assert len(chamadas) == 1
+    assert "--pos-processamento tabu" in capsys.readouterr().out
+
+
+def test_verificar_restricoes_revalida_a_cada_chamada():
+    horarios, nos, _ = alocar(os.path.join(DATASETS, "semestre1.csv"))
+    assert main.verificar_restricoes_professor(horarios, nos)
+
+    # Mesma grade, mesmas cores e horários: só os professores mudam
+    primeiro, segundo = next((a, b) for a in nos for b in nos if a is not b and a.cor == b.cor)
+    segundo.professores = list(primeiro.professores)
+
+    assert not main.verificar_restricoes_professor(horarios, nos)
+
+
+def existe_alocacao(nos, dias=5):
+    """Condição de Hall: para cada conjunto de turnos, as classes presas a ele cabem nos seus horários."""
+    mascaras = {}
+    for no in nos:
+        mascaras[no.cor] = mascaras.get(no.cor, -1) & mascaraTurnosPermitidos(no)
+    return all(sum(1 for mascara in mascaras.values() if mascara & ~conjunto == 0) <= dias * bin(conjunto).count('1')
+               for conjunto in range(1 << len(TURNOS)))
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_emparelhamento_encontra_alocacao_sempre_que_existe(semente):
+    # Uma disciplina por cor, com quantidades de cada tipo em volta da capacidade da semana
+    gerador = random.Random(semente)
+    quantidades = {('SIN', 3): gerador.randint(0, 7), ('SIN', 2): gerador.randint(0, 8),
+                   ('CCO', 3): gerador.randint(0, 12), ('CCO', 2): gerador.randint(0, 14)}
+    nos = []
+    for (curso, ch), quantidade in quantidades.items():
+        for _ in range(quantidade):
+            i = len(nos)
+            nos.append(Disciplina(i, curso, '2019', str(i), f"D{i}", f"Disciplina {i}", ch, [i]))
+            nos[-1].cor = i
+
+    horarios = alocarHorariosEmparelhamento(nos, {i: set() for i in range(len(nos))}, semente=semente)
+
+    assert (horarios is not None) == existe_alocacao(nos)
+    if horarios is not None:
+        verificar_alocacao(horarios, nos)
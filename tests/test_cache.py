@@ -0,0 +1,44 @@
+import os
+
+from main import gravarCache, lerCache
+
+
+def gravar_layout(diretorio_cache, nome, tamanho, mtime=None):
+    caminho = os.path.join(diretorio_cache, "layouts", nome + ".json")
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write("{" + " " * (tamanho - 2) + "}")
+    if mtime is not None:
+        os.utime(caminho, (mtime, mtime))
+    return caminho
+
+
+def test_layouts_contam_no_limite_do_cache(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    diretorio = str(tmp_path / "cache")
+    (tmp_path / "saida.csv").write_text("x" * 1000)
+    antigo = gravar_layout(diretorio, "antigo", 4000, 1_000_000)
+    recente = gravar_layout(diretorio, "recente", 4000)
+
+    gravarCache("chave", {'horarios': []}, ["saida.csv"], diretorio, tamanho_maximo=6000)
+
+    # Só o layout usado há mais tempo sai: a entrada nova e o layout recente cabem no limite
+    assert not os.path.exists(antigo)
+    assert os.path.exists(recente)
+    assert lerCache("chave", diretorio) is not None
+
+
+def test_entrada_antiga_sai_antes_de_um_layout_recente(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    diretorio = str(tmp_path / "cache")
+    (tmp_path / "saida.csv").write_text("x" * 1000)
+    gravarCache("antiga", {'horarios': []}, ["saida.csv"], diretorio)
+    resultado_antigo = os.path.join(diretorio, "antiga", "resultado.json")
+    os.utime(resultado_antigo, (1_000_000, 1_000_000))
+    layout = gravar_layout(diretorio, "layout", 1000)
+
+    gravarCache("nova", {'horarios': []}, ["saida.csv"], diretorio, tamanho_maximo=2500)
+
+    assert not os.path.exists(os.path.join(diretorio, "antiga"))
+    assert os.path.exists(layout)
+    assert lerCache("nova", diretorio) is not None
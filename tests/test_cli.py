@@ -0,0 +1,33 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def comandos(monkeypatch):
+    """Troca os subcomandos por funções que só guardam os argumentos recebidos."""
+    recebidos = {}
+    monkeypatch.setattr(main, 'configurar_log', lambda: None)
+
+    def registrar(nome):
+        def comando(args):
+            recebidos[nome] = args
+            return 0
+        return comando
+
+    for nome in main.COMANDOS_CLI:
+        monkeypatch.setitem(main.COMANDOS_CLI, nome, registrar(nome))
+    return recebidos
+
+
+def test_sem_subcomando_executa_solve_sem_perfil(comandos):
+    assert main.executar_cli([]) == 0
+
+    args = comandos['solve']
+    assert not args.perfil and not args.perfilar
+
+
+def test_perfil_so_quando_pedido(comandos):
+    main.executar_cli(['solve', '--perfil'])
+
+    assert comandos['solve'].perfil
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from main import alocarHorariosEmparelhamento, colorirGrafoDSatur, colorirGrafoExato, limiteInferiorClique
+
+
+@pytest.mark.parametrize("semente", range(60))
+def test_exato_igual_ao_otimo_em_grafos_pequenos(semente, grafo_aleatorio, coloracao_valida, cromatico):
+    nos, arestas = grafo_aleatorio(4 + semente % 5, 0.2 + (semente % 6) * 0.1, semente)
+
+    cores = colorirGrafoExato(nos, arestas, limite_tempo=None)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == cromatico(arestas)
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_exato_igual_ao_otimo_com_turnos(semente, grafo_aleatorio, coloracao_valida, cromatico):
+    # CCO e SIN não dividem cor, e aulas de 3 horas só dividem cor com as que cabem em blocos de 3 horas
+    nos, arestas = grafo_aleatorio(4 + semente % 4, 0.2 + (semente % 6) * 0.1, semente,
+                                   cursos=('CCO', 'SIN'), cargas=(2, 3))
+
+    cores = colorirGrafoExato(nos, arestas, limite_tempo=None)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == cromatico(arestas, nos)
+
+
+@pytest.mark.parametrize("semestre_csv", ["semestre1.csv", "semestre2.csv"])
+@pytest.mark.parametrize("inicio", range(0, 72, 9))
+def test_exato_igual_ao_otimo_em_subgrafos_dos_semestres(semestre_csv, inicio, semestre, subgrafo,
+                                                         coloracao_valida, cromatico):
+    _, nos_semestre, arestas_semestre = semestre(semestre_csv)
+    # Quatro disciplinas seguidas (em geral da mesma turma) e três sorteadas no semestre
+    indices = list(range(inicio, inicio + 4))
+    indices += random.Random(inicio).sample([i for i in range(len(nos_semestre)) if i not in indices], 3)
+    nos, arestas = subgrafo(nos_semestre, arestas_semestre, indices)
+
+    cores = colorirGrafoExato(nos, arestas, limite_tempo=None)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == cromatico(arestas, nos)
+
+
+@pytest.mark.parametrize("semestre_csv", ["semestre1.csv", "semestre2.csv"])
+def test_exato_prova_o_minimo_nos_semestres(semestre_csv, semestre, coloracao_valida):
+    tabela, nos, arestas = semestre(semestre_csv)
+
+    cores = colorirGrafoExato(nos, arestas)
+
+    coloracao_valida(nos, arestas, cores)
+    # Uma clique com tantos nós quanto cores prova que não há coloração com menos cores
+    assert cores == limiteInferiorClique(nos, arestas, tabela)
+    assert alocarHorariosEmparelhamento(nos, arestas, tabela=tabela) is not None
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_exato_entre_limite_inferior_e_dsatur(semente, grafo_aleatorio, coloracao_valida):
+    nos, arestas = grafo_aleatorio(30, 0.3, semente, cursos=('CCO', 'SIN'), cargas=(2, 3))
+    limite_inferior = limiteInferiorClique(nos, arestas)
+    cores_dsatur = colorirGrafoDSatur(nos, arestas)
+
+    cores = colorirGrafoExato(nos, arestas)
+
+    coloracao_valida(nos, arestas, cores)
+    assert limite_inferior <= cores <= cores_dsatur
+
+
+def test_grafo_sem_arestas_usa_uma_cor(grafo_aleatorio, coloracao_valida):
+    nos, arestas = grafo_aleatorio(10, 0.0, 1)
+
+    cores = colorirGrafoExato(nos, arestas)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == 1
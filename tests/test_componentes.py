@@ -0,0 +1,116 @@
+import copy
+import random
+
+import pytest
+
+from classes.Disciplina import Disciplina
+from classes.TabelaDisciplinas import TabelaDisciplinas
+from main import (MOTORES_COLORACAO, alocarHorariosEmparelhamento, colorirGrafoDSatur, colorirPorComponentes,
+                  criarListaAdjacencia, encontrarComponentes, limiteInferiorClique, validar_agendamento)
+
+
+def juntar_grafos(grafos):
+    """União disjunta de (nos, arestas), renumerando índices."""
+    nos, arestas = [], {}
+    for nos_grafo, arestas_grafo in grafos:
+        deslocamento = len(nos)
+        for no in nos_grafo:
+            no.indice += deslocamento
+            no.periodo = str(no.indice)
+            no.turma = f"{no.curso}-{no.ppc}.{no.periodo}"
+            no.professores = [no.indice]
+            nos.append(no)
+        for i, vizinhos in arestas_grafo.items():
+            arestas[i + deslocamento] = {j + deslocamento for j in vizinhos}
+    return nos, arestas
+
+
+@pytest.mark.parametrize("trabalhadores", [1, 2])
+@pytest.mark.parametrize("semente", range(10))
+def test_juncao_usa_o_maximo_das_componentes(semente, trabalhadores, grafo_aleatorio, coloracao_valida):
+    # Todas as máscaras iguais: as componentes podem sempre dividir as cores globais
+    partes = [grafo_aleatorio(8 + 3 * c, 0.5, semente * 10 + c) for c in range(4)]
+    cores_partes = [colorirGrafoDSatur(*parte) for parte in partes]
+    nos, arestas = juntar_grafos(partes)
+
+    cores = colorirPorComponentes(nos, arestas, 'dsatur', trabalhadores)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == max(cores_partes)
+
+
+@pytest.mark.parametrize("motor", ['dsatur', 'greedy', 'exato'])
+@pytest.mark.parametrize("semente", range(10))
+def test_componentes_com_turnos_diferentes(semente, motor, grafo_aleatorio, coloracao_valida):
+    partes = [grafo_aleatorio(10, 0.4, semente * 10 + c, cursos=('CCO', 'SIN'), cargas=(2, 3)) for c in range(5)]
+    nos, arestas = juntar_grafos(partes)
+    limite_inferior = limiteInferiorClique(nos, arestas)
+
+    cores = colorirPorComponentes(nos, arestas, motor, 1)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores >= limite_inferior
+
+
+def alocar_das_duas_formas(nos, arestas, motor):
+    """Horários alocados a partir da coloração em uma passada e da junção das componentes."""
+    resultados = []
+    for colorir in (MOTORES_COLORACAO[motor], lambda nos, arestas: colorirPorComponentes(nos, arestas, motor, 1)):
+        copia = copy.deepcopy(nos)
+        colorir(copia, arestas)
+        resultados.append((alocarHorariosEmparelhamento(copia, arestas, tabela=TabelaDisciplinas(copia)), copia))
+    return resultados
+
+
+@pytest.mark.parametrize("motor", ['dsatur', 'greedy', 'exato'])
+def test_semestres_juntos_alocados_como_em_uma_passada(motor, semestre, coloracao_valida):
+    # Os dois semestres como departamentos independentes: turmas e professores distintos
+    _, nos, _ = semestre("semestre1.csv")
+    _, nos_semestre2, _ = semestre("semestre2.csv")
+    for no in nos_semestre2:
+        nos.append(Disciplina(len(nos), no.curso, f"{no.ppc}-2", no.periodo, no.codigo, no.nome, no.ch,
+                              [prof + 1000 for prof in no.professores]))
+    arestas = criarListaAdjacencia(nos, TabelaDisciplinas(nos))
+    assert len(encontrarComponentes(arestas)) == 2
+
+    (horarios_passada, _), (horarios, nos_juncao) = alocar_das_duas_formas(nos, arestas, motor)
+
+    coloracao_valida(nos_juncao, arestas, len({no.cor for no in nos_juncao}))
+    assert horarios_passada is not None and horarios is not None
+    assert validar_agendamento(horarios, nos_juncao) == []
+
+
+@pytest.mark.parametrize("motor", ['dsatur', 'exato'])
+@pytest.mark.parametrize("semente", range(30))
+def test_juncao_aloca_sempre_que_a_passada_unica_aloca(semente, motor, grafo_aleatorio):
+    gerador = random.Random(semente)
+    partes = [grafo_aleatorio(gerador.randint(4, 12), gerador.choice([0.3, 0.6, 0.9]), semente * 10 + c,
+                              cursos=('CCO', 'SIN'), cargas=(2, 3)) for c in range(gerador.randint(2, 6))]
+    nos, arestas = juntar_grafos(partes)
+
+    (horarios_passada, _), (horarios, nos_juncao) = alocar_das_duas_formas(nos, arestas, motor)
+
+    # A junção agrupa classes de mesma máscara, então pode caber na semana quando a passada
+    # única não cabe, mas nunca o contrário
+    if horarios_passada is not None:
+        assert horarios is not None
+    if horarios is not None:
+        assert validar_agendamento(horarios, nos_juncao) == []
+
+
+def test_juncao_sem_horarios_falha_como_a_passada_unica():
+    # Uma componente com 11 aulas de SIN do mesmo professor não cabe nos 10 horários noturnos
+    nos = [Disciplina(i, 'SIN', '2019', '1', f"D{i}", f"Disciplina {i}", 2, [1]) for i in range(11)]
+    nos += [Disciplina(11 + i, 'CCO', '2019', '1', f"C{i}", f"Disciplina {11 + i}", 2, [2]) for i in range(4)]
+    arestas = {i: set(range(11)) - {i} for i in range(11)}
+    arestas.update({i: set(range(11, 15)) - {i} for i in range(11, 15)})
+
+    (horarios_passada, _), (horarios, _) = alocar_das_duas_formas(nos, arestas, 'dsatur')
+
+    assert horarios_passada is None and horarios is None
+
+
+def test_encontrar_componentes():
+    arestas = {0: {1}, 1: {0}, 2: set(), 3: {4}, 4: {3, 5}, 5: {4}}
+
+    assert sorted(encontrarComponentes(arestas)) == [[0, 1], [2], [3, 4, 5]]
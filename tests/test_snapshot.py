@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from classes.SnapshotAgendamento import SnapshotAgendamento
+from main import TURNOS, alocarHorariosEmparelhamento, colorirGrafoDSatur
+
+
+@pytest.fixture
+def agendamento(semestre):
+    tabela, nos, arestas = semestre("semestre1.csv")
+    colorirGrafoDSatur(nos, arestas)
+    horarios = alocarHorariosEmparelhamento(nos, arestas, tabela=tabela)
+    return tabela, nos, arestas, horarios
+
+
+def test_snapshot_reconstroi_o_agendamento(agendamento, tmp_path):
+    tabela, nos, arestas, horarios = agendamento
+    caminho = str(tmp_path / "agendamento.npz")
+    SnapshotAgendamento.salvar(caminho, nos, arestas, horarios, tabela=tabela, turnos=TURNOS)
+
+    with SnapshotAgendamento(caminho) as snapshot:
+        reconstruidos = snapshot.disciplinas()
+        assert snapshot.lista_adjacencia() == arestas
+        assert snapshot.horarios() == horarios
+
+    atributos = ('curso', 'ppc', 'periodo', 'codigo', 'nome', 'ch', 'professores', 'turma', 'cor', 'horario')
+    assert [[getattr(no, a) for a in atributos] for no in reconstruidos] == \
+           [[getattr(no, a) for a in atributos] for no in nos]
+
+
+def test_arrays_numericos_mapeados_sem_copia(agendamento, tmp_path):
+    tabela, nos, arestas, horarios = agendamento
+    caminho = str(tmp_path / "agendamento.npz")
+    SnapshotAgendamento.salvar(caminho, nos, arestas, horarios, tabela=tabela, turnos=TURNOS)
+
+    with SnapshotAgendamento(caminho) as snapshot:
+        for nome in snapshot.arquivo.files:
+            array = getattr(snapshot, nome)
+            # Textos viram ids na tabela de strings: nenhum array de unicode ou de objetos
+            assert array.dtype.kind in 'biu', nome
+            assert isinstance(array, np.memmap) and not array.flags.writeable, nome
+        assert snapshot.textos('nome') == [no.nome for no in nos]
+
+
+def test_snapshot_com_textos_em_unicode_ainda_e_lido(agendamento, tmp_path):
+    # Formato anterior à tabela de strings, com as colunas de texto como arrays de unicode
+    tabela, nos, arestas, _ = agendamento
+    caminho = str(tmp_path / "antigo.npz")
+    SnapshotAgendamento.salvar(caminho, nos, arestas, tabela=tabela)
+    with SnapshotAgendamento(caminho) as snapshot:
+        arrays = {nome: np.array(getattr(snapshot, nome)) for nome in snapshot.arquivo.files
+                  if not nome.startswith('textos_')}
+        for nome in ('nomes_cursos', 'nomes_turmas', 'ppc', 'periodo', 'codigo', 'nome', 'horario'):
+            arrays[nome] = np.array(snapshot.textos(nome), dtype=str)
+    np.savez(caminho, **arrays)
+
+    with SnapshotAgendamento(caminho) as snapshot:
+        assert [no.nome for no in snapshot.disciplinas()] == [no.nome for no in nos]
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from main import alocarHorariosEmparelhamento, colorirGrafo, limiteInferiorClique, reduzirCoresTabu
+
+
+@pytest.mark.parametrize("semente", range(40))
+def test_tabu_nunca_piora_e_respeita_os_limites(semente, grafo_aleatorio, coloracao_valida, cromatico):
+    nos, arestas = grafo_aleatorio(4 + semente % 5, 0.2 + (semente % 6) * 0.1, semente)
+    cores_iniciais = colorirGrafo(nos, arestas)
+
+    cores = reduzirCoresTabu(nos, arestas, semente=semente)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cromatico(arestas) <= cores <= cores_iniciais
+
+
+@pytest.mark.parametrize("semente", range(20))
+def test_tabu_em_grafos_maiores_com_turnos(semente, grafo_aleatorio, coloracao_valida):
+    nos, arestas = grafo_aleatorio(60, 0.2, semente, cursos=('CCO', 'SIN'), cargas=(2, 3))
+    limite_inferior = limiteInferiorClique(nos, arestas)
+    cores_iniciais = colorirGrafo(nos, arestas)
+
+    cores = reduzirCoresTabu(nos, arestas, max_iteracoes=2000, limite_inferior=limite_inferior, semente=semente)
+
+    coloracao_valida(nos, arestas, cores)
+    assert limite_inferior <= cores <= cores_iniciais
+
+
+def test_tabu_para_no_limite_inferior(grafo_aleatorio, coloracao_valida):
+    nos, arestas = grafo_aleatorio(40, 0.3, 7)
+    cores_iniciais = colorirGrafo(nos, arestas)
+
+    cores = reduzirCoresTabu(nos, arestas, limite_inferior=cores_iniciais)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == cores_iniciais
+
+
+def test_tabu_com_limite_de_tempo_zero_mantem_a_coloracao(grafo_aleatorio, coloracao_valida):
+    nos, arestas = grafo_aleatorio(40, 0.3, 3)
+    cores_iniciais = colorirGrafo(nos, arestas)
+    anteriores = [no.cor for no in nos]
+
+    cores = reduzirCoresTabu(nos, arestas, limite_tempo=0.0)
+
+    coloracao_valida(nos, arestas, cores)
+    assert cores == cores_iniciais
+    # As cores podem ser renumeradas, mas as classes são as mesmas
+    assert len({(anterior, no.cor) for anterior, no in zip(anteriores, nos)}) == cores
+
+
+@pytest.mark.parametrize("semestre_csv", ["semestre1.csv", "semestre2.csv"])
+@pytest.mark.parametrize("semente", range(5))
+def test_tabu_nunca_piora_a_coloracao_inicial_dos_semestres(semestre_csv, semente, semestre, coloracao_valida):
+    tabela, nos, arestas = semestre(semestre_csv)
+    limite_inferior = limiteInferiorClique(nos, arestas, tabela)
+    ordem = list(range(len(nos)))
+    random.Random(semente).shuffle(ordem)
+    cores_iniciais = colorirGrafo(nos, arestas, ordem)
+
+    cores = reduzirCoresTabu(nos, arestas, limite_inferior=limite_inferior, semente=semente)
+
+    coloracao_valida(nos, arestas, cores)
+    assert limite_inferior <= cores <= cores_iniciais
+    assert alocarHorariosEmparelhamento(nos, arestas, tabela=tabela) is not None
+
+
+@pytest.mark.parametrize("semestre_csv", ["semestre1.csv", "semestre2.csv"])
+@pytest.mark.parametrize("max_iteracoes", [0, 1, 10, 100, 1000])
+def test_tabu_partindo_de_uma_cor_por_disciplina(semestre_csv, max_iteracoes, semestre, coloracao_valida):
+    tabela, nos, arestas = semestre(semestre_csv)
+    limite_inferior = limiteInferiorClique(nos, arestas, tabela)
+    for i, no in enumerate(nos):
+        no.cor = i
+
+    cores = reduzirCoresTabu(nos, arestas, max_iteracoes=max_iteracoes, limite_inferior=limite_inferior)
+
+    # Com qualquer limite de iterações o resultado é válido, e as cores cujos nós cabem em outras
+    # sem conflito saem mesmo sem iterações da busca
+    coloracao_valida(nos, arestas, cores)
+    assert limite_inferior <= cores < len(nos)